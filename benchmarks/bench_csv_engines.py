@@ -0,0 +1,77 @@
+"""
+Compare the "c" and "pyarrow" CSV parser backends on generated client rosters.
+
+Usage:
+    python benchmarks/bench_csv_engines.py [--sizes 10000 100000 1000000] [--repeat 3]
+
+Each size is written as CSV and TSV and run through process_csv_data and
+process_tsv_data end to end (parsing and normalization). The C parser is
+timed in one pass and in INGEST_CHUNK_SIZE chunks, as the app runs it.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_normalize_dataframe import make_roster
+from src.config import INGEST_CHUNK_SIZE
+from src.utils.data_processing import _arrow_available, process_csv_data, process_tsv_data
+
+# (label, engine, chunksize) of each timed configuration
+CONFIGURATIONS = [
+    ("c", "c", None),
+    (f"c, chunks of {INGEST_CHUNK_SIZE}", "c", INGEST_CHUNK_SIZE),
+    ("pyarrow", "pyarrow", None),
+]
+
+def best_time(function, repeat):
+    """Return the fastest of several calls of function, in seconds, and its last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def same_output(left, right):
+    """Check that two (clients_df, admissions_df) results hold the same values."""
+    return all(
+        a.astype(object).fillna('').equals(b.astype(object).fillna(''))
+        for a, b in zip(left, right)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per configuration, the fastest is reported")
+    args = parser.parse_args()
+
+    if not _arrow_available():
+        sys.exit("pyarrow is not installed; the pyarrow engine would fall back to the C parser")
+
+    print(f"{'format':>6} {'rows':>9} {'MB':>7} " + " ".join(f"{label:>22}" for label, _, _ in CONFIGURATIONS))
+    for rows in args.sizes:
+        roster = make_roster(rows)
+        csv_bytes = roster.to_csv(index=False).encode("utf-8")
+        tsv_text = roster.to_csv(index=False, sep="\t")
+        inputs = [
+            ("csv", len(csv_bytes), lambda engine, chunksize: process_csv_data(
+                io.BytesIO(csv_bytes), chunksize=chunksize, engine=engine)),
+            ("tsv", len(tsv_text), lambda engine, chunksize: process_tsv_data(
+                tsv_text, chunksize=chunksize, engine=engine)),
+        ]
+        for fmt, size, run in inputs:
+            timings = []
+            reference = None
+            for _, engine, chunksize in CONFIGURATIONS:
+                seconds, result = best_time(lambda: run(engine, chunksize), args.repeat)
+                reference = reference or result
+                mismatch = "" if same_output(reference, result) else " (differs)"
+                timings.append(f"{seconds:.3f}s{mismatch}")
+            print(f"{fmt:>6} {rows:>9} {size / 1e6:7.1f} " + " ".join(f"{t:>22}" for t in timings))
+
+if __name__ == "__main__":
+    main()
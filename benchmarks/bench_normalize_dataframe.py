@@ -0,0 +1,73 @@
+"""
+Time normalize_dataframe on generated client rosters.
+
+Usage:
+    python benchmarks/bench_normalize_dataframe.py [--sizes 10000 100000 1000000] [--baseline]
+
+--baseline also times the original row-wise implementation (kept in
+normalize_baseline.py); expect it to take minutes at 1M rows.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.data_processing import normalize_dataframe
+from benchmarks.normalize_baseline import baseline_normalize_dataframe
+
+def make_roster(rows, seed=0):
+    """
+    Build a roster shaped like a provider export, read as text.
+
+    Args:
+        rows (int): Number of clients
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        pd.DataFrame: Raw roster with unnormalized column names
+    """
+    rng = np.random.default_rng(seed)
+    first = np.array(["John", "Mary Ann", "Luis", "Wei", "Aisha", "Jean Luc"])
+    last = np.array(["Smith", "Lee", "Garcia", "Chen", "Khan", "Picard"])
+    months = rng.integers(1, 13, rows).astype(str)
+    days = rng.integers(1, 29, rows).astype(str)
+    years = rng.integers(1940, 2010, rows).astype(str)
+    ids = np.arange(100000, 100000 + rows).astype(str)
+    # Spreadsheet exports often turn IDs into floats
+    ids[::5] = np.char.add(ids[::5], ".0")
+    return pd.DataFrame({
+        "Unique ID": ids,
+        "Client": np.char.add(np.char.add(rng.choice(first, rows), " "), rng.choice(last, rows)),
+        "DOB": np.char.add(np.char.add(np.char.add(np.char.add(months, "/"), days), "/"), years),
+        "Sex": rng.choice(["Male", "Female", "Other", ""], rows),
+        "Zip": rng.integers(80000, 81000, rows).astype(str),
+        "Admission Date": rng.choice(["1/5/2024", "02/14/2024", "3/30/2024", ""], rows),
+        "Referral Source": rng.choice(["Court", "Self", ""], rows),
+    }).astype(object)
+
+def time_call(function, df):
+    """Return the seconds one call of function takes on a copy of df."""
+    data = df.copy()
+    start = time.perf_counter()
+    function(data)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--baseline", action="store_true", help="also time the original implementation")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'vectorized (s)':>15} {'baseline (s)':>13}")
+    for rows in args.sizes:
+        df = make_roster(rows)
+        vectorized = time_call(normalize_dataframe, df)
+        baseline = f"{time_call(baseline_normalize_dataframe, df):13.2f}" if args.baseline else f"{'-':>13}"
+        print(f"{rows:>10} {vectorized:15.3f} {baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+The row-wise normalize_dataframe from before the vectorized rewrite.
+
+Kept as the reference the parity tests compare against and the benchmark
+times with --baseline.
+"""
+from datetime import datetime
+import pandas as pd
+from src.config import FIELD_MAPPING
+
+def baseline_format_date(date_str):
+    """format_date as it was before the vectorized rewrite."""
+    try:
+        if not date_str or not isinstance(date_str, str):
+            return ""
+        date_obj = datetime.strptime(date_str.strip(), "%m/%d/%Y")
+        return date_obj.strftime("%m/%d/%Y")
+    except ValueError:
+        try:
+            date_obj = datetime.strptime(date_str.strip(), "%-m/%d/%Y")
+            return date_obj.strftime("%m/%d/%Y")
+        except ValueError:
+            return ""
+
+def baseline_normalize_dataframe(df):
+    """normalize_dataframe as it was before the vectorized rewrite."""
+    df.columns = [col.strip().lower() for col in df.columns]
+    df = df.rename(columns=FIELD_MAPPING)
+    df = df.fillna('')
+    
+    id_columns = ['ProviderClientId', 'ProviderAdmissionId']
+    for col in id_columns:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda x: str(int(float(x))) if pd.notnull(x) and str(x).strip() != '' else str(x))
+    
+    for col in df.columns:
+        if col not in id_columns:
+            df[col] = df[col].astype(str).replace('nan', '')
+    
+    date_columns = ['DateofBirth', 'AdmissionDate']
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda x: baseline_format_date(str(x)) if x else '')
+    
+    if 'ClientFullName' in df.columns and not df['ClientFullName'].empty:
+        if 'FirstName' not in df.columns or df['FirstName'].eq('').all():
+            df['FirstName'] = ''
+        if 'LastName' not in df.columns or df['LastName'].eq('').all():
+            df['LastName'] = ''
+        for idx, row in df.iterrows():
+            if row['ClientFullName'] and not (row['FirstName'] and row['LastName']):
+                name_parts = row['ClientFullName'].strip().split()
+                if len(name_parts) > 1:
+                    df.at[idx, 'FirstName'] = ' '.join(name_parts[:-1])
+                    df.at[idx, 'LastName'] = name_parts[-1]
+                elif len(name_parts) == 1:
+                    df.at[idx, 'LastName'] = name_parts[0]
+    
+    return df
@@ -0,0 +1,191 @@
+"""
+Headless batch pipeline: ingest rosters, build records and write the export CSVs.
+
+Runs the same processing as the Streamlit app directly on files, without a
+UI session, e.g. for a nightly monthly-submission job:
+
+    python -m src.batch_pipeline site1.csv site2.csv --surveys surveys.json --output-dir export/
+"""
+import argparse
+import json
+import os
+import sys
+import pandas as pd
+from src.config import ADMISSION_COLUMNS, CSV_PARSER_ENGINE, DISCHARGE_COLUMNS, INGEST_CHUNK_SIZE, SURVEY_COLUMNS
+from src.utils.data_processing import process_csv_files
+from src.utils.export_formatting import format_admissions_for_export, format_clients_for_export
+
+# Number of surveys handed to a worker process at a time
+SURVEY_BATCH_SIZE = 500
+
+def _latest_admissions(admissions_df):
+    """
+    Map each client to their most recent admission.
+
+    Args:
+        admissions_df (pd.DataFrame): Admission data
+
+    Returns:
+        dict: ProviderClientId -> ProviderAdmissionId
+    """
+    if admissions_df.empty:
+        return {}
+
+    ordered = admissions_df.assign(
+        _admission_sort=pd.to_datetime(admissions_df['AdmissionDate'], format="%m/%d/%Y", errors='coerce')
+    ).sort_values('_admission_sort', na_position='first', kind='stable')
+    latest = ordered.drop_duplicates(subset='ProviderClientId', keep='last')
+    return dict(zip(latest['ProviderClientId'], latest['ProviderAdmissionId']))
+
+def _import_survey_batch(batch):
+    """
+    Import, validate and format a batch of surveys in a worker process.
+
+    Args:
+        batch (list): (client_id, admission_id, answers) tuples, where answers maps
+            question text to value as accepted by SurveyEngine.import_json_answers
+
+    Returns:
+        tuple: (survey_rows, errors) - answer rows for valid surveys, and
+            (admission_id, message) pairs for surveys that were skipped
+    """
+    from src.survey_config import ADMISSION_SURVEY_QUESTIONS
+    from src.utils.survey_engine import SurveyEngine, build_survey_rows
+
+    survey_rows = []
+    errors = []
+    for client_id, admission_id, answers in batch:
+        survey_engine = SurveyEngine(ADMISSION_SURVEY_QUESTIONS)
+        success, message = survey_engine.import_json_answers(json.dumps(answers))
+        if not success:
+            errors.append((admission_id, message))
+            continue
+
+        if not survey_engine.validate_all():
+            details = "; ".join(f"{seq_num}: {error}" for seq_num, error in survey_engine.errors.items())
+            errors.append((admission_id, f"Validation failed ({details})"))
+            continue
+
+        survey_rows.extend(build_survey_rows(client_id, admission_id, survey_engine.get_formatted_answers()))
+
+    return survey_rows, errors
+
+def import_surveys(survey_path, admissions_df, max_workers=None):
+    """
+    Bulk import survey answers from a JSON file.
+
+    The file holds one object whose keys are ProviderAdmissionId values or
+    ProviderClientId values (matched to the client's most recent admission),
+    and whose values are the survey answers keyed by question text.
+
+    Args:
+        survey_path (str): Path to the JSON file
+        admissions_df (pd.DataFrame): Admissions the surveys belong to
+        max_workers (int, optional): Number of worker processes
+
+    Returns:
+        tuple: (survey_df, errors) - survey answer records and (key, message)
+            pairs for surveys that could not be imported
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(survey_path, encoding="utf-8") as survey_file:
+        surveys = json.load(survey_file)
+
+    admission_clients = {}
+    if not admissions_df.empty:
+        admission_clients = dict(zip(admissions_df['ProviderAdmissionId'], admissions_df['ProviderClientId']))
+    latest_admissions = _latest_admissions(admissions_df)
+
+    items = []
+    errors = []
+    for key, answers in surveys.items():
+        if key in admission_clients:
+            items.append((admission_clients[key], key, answers))
+        elif key in latest_admissions:
+            items.append((key, latest_admissions[key], answers))
+        else:
+            errors.append((key, "No matching admission or client"))
+
+    batches = [items[i:i + SURVEY_BATCH_SIZE] for i in range(0, len(items), SURVEY_BATCH_SIZE)]
+    if len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_import_survey_batch, batches))
+    else:
+        results = [_import_survey_batch(batch) for batch in batches]
+
+    survey_rows = []
+    for batch_rows, batch_errors in results:
+        survey_rows.extend(batch_rows)
+        errors.extend(batch_errors)
+
+    return pd.DataFrame(survey_rows, columns=SURVEY_COLUMNS), errors
+
+def run_pipeline(input_paths, output_dir, survey_path=None, max_workers=None,
+                 chunksize=INGEST_CHUNK_SIZE, engine=CSV_PARSER_ENGINE):
+    """
+    Ingest roster files, build admission and survey records, and write the export CSVs.
+
+    Args:
+        input_paths (list): Paths to CSV roster files
+        output_dir (str): Directory the four export files are written to
+        survey_path (str, optional): JSON file with survey answers to import
+        max_workers (int, optional): Number of worker processes, defaults to the CPU count
+        chunksize (int, optional): Number of rows each worker reads at a time
+        engine (str): Parser backend, "c" or "pyarrow"
+
+    Returns:
+        dict: Record counts per output file and survey import errors
+    """
+    clients_df, admissions_df = process_csv_files(
+        input_paths, max_workers=max_workers, chunksize=chunksize, engine=engine
+    )
+
+    survey_df = pd.DataFrame(columns=SURVEY_COLUMNS)
+    survey_errors = []
+    if survey_path:
+        survey_df, survey_errors = import_surveys(survey_path, admissions_df, max_workers)
+
+    discharges_df = pd.DataFrame(columns=DISCHARGE_COLUMNS)
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {
+        "clients.csv": format_clients_for_export(clients_df),
+        "admissions.csv": format_admissions_for_export(
+            admissions_df if not admissions_df.empty else pd.DataFrame(columns=ADMISSION_COLUMNS)
+        ),
+        "surveys.csv": survey_df,
+        "discharges.csv": discharges_df
+    }
+    for file_name, df in outputs.items():
+        df.to_csv(os.path.join(output_dir, file_name), index=False)
+
+    result = {file_name: len(df) for file_name, df in outputs.items()}
+    result["survey_errors"] = survey_errors
+    return result
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Build client, admission, survey and discharge export files.")
+    parser.add_argument("inputs", nargs="+", help="CSV roster files to ingest")
+    parser.add_argument("--output-dir", default=".", help="Directory to write the export CSVs to")
+    parser.add_argument("--surveys", help="JSON file of survey answers keyed by admission or client ID")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE, help="Rows read at a time per file")
+    parser.add_argument("--engine", choices=["c", "pyarrow"], default=CSV_PARSER_ENGINE, help="CSV parser backend")
+    args = parser.parse_args(argv)
+
+    result = run_pipeline(
+        args.inputs, args.output_dir, survey_path=args.surveys, max_workers=args.workers,
+        chunksize=args.chunk_size, engine=args.engine
+    )
+
+    for file_name in ("clients.csv", "admissions.csv", "surveys.csv", "discharges.csv"):
+        print(f"{file_name}: {result[file_name]} records")
+    for key, message in result["survey_errors"]:
+        print(f"Survey {key} skipped: {message}", file=sys.stderr)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,49 +3,335 @@ Data ingestion component for uploading and processing client data.
 """
 import streamlit as st
 import pandas as pd
-from src.utils.data_processing import process_csv_data, process_tsv_data
+from src.config import (
+    CSV_PARSER_ENGINE, INGEST_CACHE_SIZE, INGEST_CHUNK_SIZE, INGEST_MAPPED_COLUMNS_ONLY, INGEST_MAX_WORKERS,
+    INDEXED_MERGE_RATIO
+)
+from src.utils.dataset_store import (
+    append_records, get_dataset, journal_action, journal_state, record_index, set_dataset, update_cells
+)
+from src.utils.data_processing import (
+    normalize_client_table, process_csv_files, process_tsv_data_incremental, upload_provider
+)
+from src.utils.ingestion_cache import IngestionCache, ingestion_cache_key
+from src.utils.merge_engine import ADMISSION_KEY, CLIENT_KEY, apply_upsert, plan_upsert, resolve_incoming_ids
+
+def _progress_reporter(progress_bar, label):
+    """
+    Create a progress callback that updates a Streamlit progress bar.
+    
+    Args:
+        progress_bar: Streamlit progress bar element
+        label (str): Text shown next to the row count
+        
+    Returns:
+        callable: Callback accepting (items_processed, fraction)
+    """
+    def report(processed, fraction):
+        progress_bar.progress(fraction or 0.0, text=f"{label}: {processed:,} processed")
+    return report
+
+@st.cache_resource
+def _shared_ingestion_cache(tenant):
+    """
+    Return the process-wide ingestion cache of a tenant.
+    
+    Every session of the tenant reads from and adds to the same cache, and
+    the processed frames are not copied, so a roster opened by several
+    coordinators is parsed and held once. The frames are shared read-only:
+    sessions keep them as the base of their datasets and dataset_store
+    holds each session's changes apart from them.
+    
+    Args:
+        tenant (str): Namespace of the cache, the provider IDs of the upload
+        
+    Returns:
+        IngestionCache: Shared cache
+    """
+    return IngestionCache(INGEST_CACHE_SIZE, copy_results=False)
+
+def _already_loaded(state_key, cache_key, upload_ids=None):
+    """
+    Return the ingest record of an input that does not need loading again.
+    
+    Args:
+        state_key (str): Session state key of the source's ingest record
+        cache_key (str): Key from ingestion_cache_key for the current input
+        upload_ids (list, optional): File IDs of the uploaded files
+        
+    Returns:
+        dict or None: The ingest record, None if the input must be loaded
+    """
+    last_ingest = st.session_state.get(state_key)
+    if last_ingest is None or last_ingest["key"] != cache_key:
+        return None
+    if last_ingest["undone"] and last_ingest["upload_ids"] != upload_ids:
+        return None
+    return last_ingest
+
+def _load_source(label, cache_key, process, tenant=None, upload_ids=None):
+    """
+    Merge an input source into session state unless it is already loaded.
+    
+    An unchanged input costs one hash per rerun and leaves the session data
+    (including edits made on other pages) untouched. Changed inputs are
+    looked up in the ingestion cache before being parsed, then upserted into
+    the existing clients and admissions.
+    
+    Undoing a load marks it as undone rather than forgetting it, so the input
+    still on the page is not merged straight back in. Uploading the files
+    again (or changing the input) loads it again.
+    
+    Args:
+        label (str): Source label used in progress text ("CSV" or "TSV")
+        cache_key (str): Key from ingestion_cache_key for the current input
+        process (callable): Called with a progress callback, returns (clients_df, admissions_df)
+        tenant (str, optional): Provider the input belongs to (see upload_provider),
+            whose ingestion cache is used; None skips the cache
+        upload_ids (list, optional): File IDs of the uploaded files, which change on every upload
+        
+    Returns:
+        dict: Record counts of the loaded source and its merge results; "undone"
+            is True when the load of this input was undone
+    """
+    state_key = f"last_{label.lower()}_ingest"
+    last_ingest = _already_loaded(state_key, cache_key, upload_ids)
+    if last_ingest is not None:
+        return last_ingest
+    
+    cache = _shared_ingestion_cache(tenant) if tenant is not None else None
+    result = cache.get(cache_key) if cache is not None else None
+    if result is None:
+        progress_bar = st.progress(0.0)
+        clients_df, admissions_df = process(_progress_reporter(progress_bar, f"Reading {label}"))
+        progress_bar.empty()
+        # Normalized once here, so the client table can show the shared frame as it is
+        result = (normalize_client_table(clients_df), admissions_df)
+        if cache is not None:
+            cache.put(cache_key, *result)
+    clients_df, admissions_df = result
+    return _merge_source(label, cache_key, clients_df, admissions_df, upload_ids=upload_ids)
+
+def _merge_dataset(name, existing_df, plan):
+    """
+    Write an upsert plan to a session dataset.
+    
+    Changed cells go through update_cells and new rows through
+    append_records, so only the touched rows are copied and journaled.
+    
+    Args:
+        name (str): Session state key of the dataset
+        existing_df (pd.DataFrame): Current contents the plan was made for
+        plan (dict): Result of plan_upsert
+    """
+    if plan["replace"] is not None:
+        set_dataset(name, plan["replace"])
+    elif plan["new_columns"]:
+        # Existing rows need the new columns first, so the merged frame is written whole
+        set_dataset(name, apply_upsert(existing_df, plan))
+    else:
+        update_cells(name, plan["updates"])
+        if not plan["inserts"].empty:
+            append_records(name, plan["inserts"].to_dict("records"))
+
+def _key_index(name, existing_df, incoming_df, key_columns):
+    """
+    Get the session index of a dataset's first key column, for merging a few rows.
+    
+    Matching through the index costs a lookup per incoming row, while
+    hashing every key costs time in the size of the dataset, so the index is
+    only used when the incoming rows are few in comparison.
+    
+    Args:
+        name (str): Session state key of the dataset
+        existing_df (pd.DataFrame): Current data of the dataset
+        incoming_df (pd.DataFrame): Rows to merge
+        key_columns (list): Columns that identify a record
+        
+    Returns:
+        dict or None: Result of record_index, or None to match by hashing
+    """
+    if (len(incoming_df) * INDEXED_MERGE_RATIO >= len(existing_df)
+            or not all(col in existing_df.columns and col in incoming_df.columns for col in key_columns)):
+        return None
+    return record_index(name, key_columns[0])
+
+def _merge_source(label, cache_key, clients_df, admissions_df, upload_ids=None, total_rows=None):
+    """
+    Upsert processed rows into the session's clients and admissions.
+    
+    Nothing is written, and no undo step is added, when no row is inserted
+    or updated.
+    
+    Args:
+        label (str): Source label ("CSV" or "TSV")
+        cache_key (str): Key from ingestion_cache_key for the input
+        clients_df (pd.DataFrame): Client rows to merge
+        admissions_df (pd.DataFrame): Admission rows to merge
+        upload_ids (list, optional): File IDs of the uploaded files
+        total_rows (tuple, optional): (clients, admissions) row counts of the
+            whole input, when only part of it is merged
+        
+    Returns:
+        dict: Ingest record, as returned by _load_source
+    """
+    state_key = f"last_{label.lower()}_ingest"
+    existing_clients = get_dataset("clients_df")
+    # Merge client data into the session so edits and created records are kept
+    plans = [("clients_df", existing_clients, plan_upsert(
+        existing_clients, clients_df, CLIENT_KEY,
+        key_index=_key_index("clients_df", existing_clients, clients_df, CLIENT_KEY)
+    ))]
+    
+    # Merge admission data if available
+    if not admissions_df.empty:
+        existing_admissions = get_dataset("admissions_df")
+        key_index = _key_index("admissions_df", existing_admissions, admissions_df, ADMISSION_KEY)
+        existing_ids = None
+        if key_index is not None and "ProviderAdmissionId" in existing_admissions.columns:
+            existing_ids = record_index("admissions_df", "ProviderAdmissionId")
+        # Generated admission IDs must not collide with admissions already in the session
+        admissions_df = resolve_incoming_ids(
+            existing_admissions, admissions_df, ADMISSION_KEY, "ProviderAdmissionId",
+            key_index=key_index, existing_ids=existing_ids
+        )
+        plans.append(("admissions_df", existing_admissions, plan_upsert(
+            existing_admissions, admissions_df, ADMISSION_KEY, key_index=key_index
+        )))
+    
+    total_clients, total_admissions = total_rows or (len(clients_df), len(admissions_df))
+    last_ingest = {
+        "key": cache_key,
+        "upload_ids": upload_ids,
+        "undone": False,
+        "clients": total_clients,
+        "admissions": total_admissions,
+        "client_counts": plans[0][2]["counts"],
+        "admission_counts": plans[1][2]["counts"] if len(plans) > 1 else None
+    }
+    
+    if any(plan["counts"]["inserted"] or plan["counts"]["updated"] for _, _, plan in plans):
+        with journal_action(f"{label} load"):
+            for name, existing_df, plan in plans:
+                _merge_dataset(name, existing_df, plan)
+            st.session_state[state_key] = last_ingest
+            journal_state(state_key, {**last_ingest, "undone": True})
+    else:
+        st.session_state[state_key] = last_ingest
+        # Undoing the previous load of this source must still cover the current input
+        journal_state(state_key, {**last_ingest, "undone": True})
+    return last_ingest
+
+def _show_merge_summary(counts):
+    """
+    Show how many client and admission rows were inserted, updated or unchanged.
+    
+    Args:
+        counts (dict): Result of _load_source
+    """
+    summaries = [("Clients", counts["client_counts"]), ("Admissions", counts["admission_counts"])]
+    for label, merge_counts in summaries:
+        if merge_counts:
+            st.caption(
+                f"{label}: {merge_counts['inserted']} added, {merge_counts['updated']} updated, "
+                f"{merge_counts['skipped']} unchanged."
+            )
+
+def _load_tsv(tsv_text, cache_key):
+    """
+    Process pasted TSV text incrementally and merge the rows it adds.
+    
+    When the previous TSV load is still in effect, only the rows produced by
+    text appended since then are merged, so pasting more rows costs about
+    the same however long the text already is.
+    
+    Args:
+        tsv_text (str): Current contents of the TSV text area
+        cache_key (str): Key from ingestion_cache_key for the text
+        
+    Returns:
+        dict: Ingest record, as returned by _load_source
+    """
+    last_ingest = _already_loaded("last_tsv_ingest", cache_key)
+    if last_ingest is not None:
+        return last_ingest
+    
+    progress_bar = st.progress(0.0)
+    clients_df, admissions_df, state = process_tsv_data_incremental(
+        tsv_text,
+        st.session_state.get("tsv_append_state"),
+        mapped_columns_only=INGEST_MAPPED_COLUMNS_ONLY,
+        chunksize=INGEST_CHUNK_SIZE,
+        progress_callback=_progress_reporter(progress_bar, "Reading TSV")
+    )
+    progress_bar.empty()
+    
+    # Rows reused from the previous parse are already merged, unless that load was undone
+    previous = st.session_state.get("last_tsv_ingest")
+    merged_rows = (0, 0)
+    if state is not None and previous is not None and not previous["undone"]:
+        merged_rows = state["reused_rows"]
+    
+    last_ingest = _merge_source(
+        "TSV", cache_key, normalize_client_table(clients_df.iloc[merged_rows[0]:]), admissions_df.iloc[merged_rows[1]:],
+        total_rows=(len(clients_df), len(admissions_df))
+    )
+    st.session_state.tsv_append_state = state
+    return last_ingest
 
 def show_data_ingestion_page():
     """Display and handle the data ingestion UI."""
     st.header("Data Ingestion")
     st.markdown("Upload a CSV file or paste TSV data below to get started.")
     
-    # File uploader for CSV
-    uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
+    # File uploader for CSV, one roster per site
+    uploaded_files = st.file_uploader("Upload CSV files", type=["csv"], accept_multiple_files=True)
     
     # Text area for TSV input
     tsv_text = st.text_area("Or paste TSV text here")
     
     # Process the uploaded data
-    if uploaded_file is not None:
+    if uploaded_files:
         try:
-            # Process the file to get both client and admission data
-            clients_df, admissions_df = process_csv_data(uploaded_file)
+            file_contents = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+            cache_key = ingestion_cache_key(file_contents, "csv", INGEST_MAPPED_COLUMNS_ONLY, CSV_PARSER_ENGINE)
+            # Parse each file in its own worker process and merge the results
+            counts = _load_source("CSV", cache_key, lambda progress_callback: process_csv_files(
+                file_contents,
+                max_workers=INGEST_MAX_WORKERS,
+                progress_callback=progress_callback,
+                chunksize=INGEST_CHUNK_SIZE,
+                mapped_columns_only=INGEST_MAPPED_COLUMNS_ONLY,
+                engine=CSV_PARSER_ENGINE
+            ), tenant=upload_provider(file_contents), upload_ids=[uploaded_file.file_id for uploaded_file in uploaded_files])
             
-            # Update session state with client data
-            st.session_state.clients_df = clients_df
-            st.success(f"CSV file successfully loaded with {len(clients_df)} client records.")
-            
-            # Update session state with admission data if available
-            if not admissions_df.empty:
-                st.session_state.admissions_df = admissions_df
-                st.success(f"Also extracted {len(admissions_df)} admission records from the CSV.")
+            if counts["undone"]:
+                st.info("Loading this CSV data was undone. Upload the files again or use Redo to load it.")
+            else:
+                if len(uploaded_files) == 1:
+                    st.success(f"CSV file successfully loaded with {counts['clients']} client records.")
+                else:
+                    st.success(f"{len(uploaded_files)} CSV files successfully loaded with {counts['clients']} client records.")
+                if counts["admissions"]:
+                    st.success(f"Also extracted {counts['admissions']} admission records from the CSV.")
+                _show_merge_summary(counts)
         except Exception as e:
             st.error(f"Error loading CSV file: {e}")
 
     # Process the TSV text input
     if tsv_text:
         try:
-            # Process the TSV to get both client and admission data
-            clients_df, admissions_df = process_tsv_data(tsv_text)
-            
-            # Update session state with client data
-            st.session_state.clients_df = clients_df
-            st.success(f"TSV data successfully loaded with {len(clients_df)} client records.")
+            cache_key = ingestion_cache_key(tsv_text, "tsv", INGEST_MAPPED_COLUMNS_ONLY)
+            # Rows pasted at the bottom are parsed on their own and appended to
+            # the previous results, so the pasted text is not re-parsed each edit
+            counts = _load_tsv(tsv_text, cache_key)
             
-            # Update session state with admission data if available
-            if not admissions_df.empty:
-                st.session_state.admissions_df = admissions_df
-                st.success(f"Also extracted {len(admissions_df)} admission records from the TSV.")
+            if counts["undone"]:
+                st.info("Loading this TSV data was undone. Change the text or use Redo to load it.")
+            else:
+                st.success(f"TSV data successfully loaded with {counts['clients']} client records.")
+                if counts["admissions"]:
+                    st.success(f"Also extracted {counts['admissions']} admission records from the TSV.")
+                _show_merge_summary(counts)
         except Exception as e:
             st.error(f"Error parsing TSV data: {e}")
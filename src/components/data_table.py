@@ -1,99 +1,555 @@
 """
 Data table component for displaying and editing client data.
 """
+import re
+import numpy as np
+import pandas as pd
 import streamlit as st
-from src.config import GENDER_OPTIONS
-from src.data_models import validate_date, validate_zip, format_date
+from src.config import CLIENT_TABLE_PAGE_SIZE, CLIENT_TABLE_PAGED_ROWS, GENDER_OPTIONS
+from src.data_models import client_error_mask, format_date, validate_date, validate_zip
+from src.utils.bulk_operations import BULK_OPERATIONS, bulk_updates, select_rows, transform_column
+from src.utils.data_processing import normalize_client_table
+from src.utils.dataset_store import (
+    append_records, dataset_length, dataset_version, get_dataset, journal_action, memoize, prime_memo,
+    read_page, record_index, set_dataset, store_normalized, update_cells
+)
+
+# Read-only editor column listing the invalid fields of each row
+ISSUES_COLUMN = "Issues"
+
+# Style of the issues column in rows with invalid fields
+ISSUES_STYLE = "background-color: #ffd6d6"
+
+def _normalized_clients():
+    """
+    Bring the whole client table into the form the editor shows and saves.
+    
+    Loaded data is normalized before it is shared between sessions, so this
+    usually finds nothing to change and the shared frame is kept.
+    
+    Returns:
+        dict: "frame" (pd.DataFrame shown in the editor) and "changed"
+            (bool, whether the frame differs from the stored client data)
+    """
+    clients_df = get_dataset("clients_df")
+    df_display = normalize_client_table(clients_df)
+    changed = not df_display.equals(clients_df)
+    return {"frame": df_display if changed else clients_df, "changed": changed}
+
+def _clean_cell(column, value):
+    """
+    Normalize one edited value the same way normalize_client_table does.
+    
+    Args:
+        column (str): Column of the edited cell
+        value: Value entered in the editor (None for an empty cell)
+        
+    Returns:
+        str: Cleaned text, the entered text if it is not a valid date or ZIP code
+    """
+    text = '' if value is None else str(value)
+    if column == 'DateofBirth':
+        text = text.strip()
+        return format_date(text) if validate_date(text) else text
+    if column == 'ZipCode':
+        return validate_zip(text) or text.strip()
+    return text
+
+def _client_errors(df_display):
+    """
+    Return the validation error mask of the client data, cached by version.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data of the current version
+        
+    Returns:
+        pd.DataFrame: Result of client_error_mask
+    """
+    return memoize("client_errors", ["clients_df"], lambda: client_error_mask(df_display))
+
+def _issue_text(errors):
+    """
+    Describe the invalid fields of each row.
+    
+    Args:
+        errors (pd.DataFrame): Error mask rows
+        
+    Returns:
+        np.ndarray: Comma-separated invalid fields per row, empty for valid rows
+    """
+    issues = pd.Series('', index=errors.index, dtype=object)
+    for col in errors.columns:
+        issues = issues + np.where(errors[col].to_numpy(), f"{col}, ", "")
+    return issues.str.rstrip(", ").to_numpy(dtype=object)
+
+def _show_error_summary(errors):
+    """
+    Report how many client rows have invalid or missing values.
+    
+    Args:
+        errors (pd.DataFrame): Error mask of the client data
+    """
+    counts = errors.sum()
+    error_rows = int(errors.any(axis=1).sum())
+    if error_rows:
+        details = ", ".join(f"{col}: {int(count)}" for col, count in counts.items() if count)
+        st.warning(
+            f"{error_rows} rows have missing or invalid values ({details}). "
+            "Dates use M/DD/YYYY or MM/DD/YYYY, ZIP codes 5 or 9 digits and Gender one of "
+            f"{', '.join(GENDER_OPTIONS)}."
+        )
+
+def _clean_edits(df_display, edited_rows):
+    """
+    Validate edited cells and keep those that change the stored value.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        edited_rows (dict): Row position in df_display -> {column: entered value}
+        
+    Returns:
+        dict: Updates for update_cells
+    """
+    updates = {}
+    for position, edits in edited_rows.items():
+        for col, value in edits.items():
+            if col not in df_display.columns:
+                continue
+            cleaned = _clean_cell(col, value)
+            if cleaned != df_display[col].iat[position]:
+                updates.setdefault(position, {})[col] = cleaned
+    return updates
+
+def _save_changes(df_display, updates, added=(), deleted=(), label="client table edit"):
+    """
+    Write cleaned table changes to the client data as one undo step.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data the changes were made to
+        updates (dict): Row position -> {column: cleaned value}
+        added (list): Records to append
+        deleted (list): Sorted positions of rows to remove
+        label (str): Description of the change on the undo button
+        
+    Returns:
+        bool: True if anything was saved
+    """
+    if not (updates or added or deleted):
+        return False
+    
+    errors = _client_errors(df_display)
+    with journal_action(label):
+        update_cells("clients_df", updates)
+        if deleted:
+            clients_df = get_dataset("clients_df")
+            set_dataset("clients_df", clients_df.drop(index=clients_df.index[deleted]).reset_index(drop=True))
+        if added:
+            append_records("clients_df", added)
+    
+    if not (added or deleted):
+        # The patched client data is already normalized; reuse it as the display
+        # frame and revalidate only the edited rows
+        clients_df = get_dataset("clients_df")
+        prime_memo("client_display", ["clients_df"], {"frame": clients_df, "changed": False})
+        
+        rows = sorted(updates)
+        errors = errors.copy()
+        errors.iloc[rows] = client_error_mask(clients_df.iloc[rows]).to_numpy()
+        prime_memo("client_errors", ["clients_df"], errors)
+    return True
+
+def _apply_editor_changes(df_display, changes):
+    """
+    Save the edited, added and deleted rows of the data editor.
+    
+    Only the cells in the change set are validated, and only those whose
+    cleaned value differs from the stored one are written, so the work
+    depends on the size of the edit rather than of the table.
+    
+    Args:
+        df_display (pd.DataFrame): Frame the editor was given
+        changes (dict): Editor state with "edited_rows", "added_rows" and "deleted_rows"
+        
+    Returns:
+        bool: True if anything was saved
+    """
+    edited_rows = {
+        int(position): edits for position, edits in changes.get("edited_rows", {}).items()
+        if int(position) < len(df_display)
+    }
+    updates = _clean_edits(df_display, edited_rows)
+    
+    added = []
+    for row in changes.get("added_rows", []):
+        record = dict.fromkeys(df_display.columns, '')
+        for col, value in row.items():
+            if col in record:
+                record[col] = _clean_cell(col, value)
+        added.append(record)
+    
+    deleted = sorted({int(position) for position in changes.get("deleted_rows", []) if int(position) < len(df_display)})
+    
+    return _save_changes(df_display, updates, added, deleted)
+
+def _page_order(df_display, errors, search, filter_column, filter_text, sort_column, descending, errors_only):
+    """
+    Find the rows of the client table to page through.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        errors (pd.DataFrame): Error mask of the client data
+        search (str): Text to look for in any of the searched columns
+        filter_column (str or None): Column filter_text must appear in
+        filter_text (str): Text the filter column must contain
+        sort_column (str or None): Column to sort by, None keeps the stored order
+        descending (bool): Sort in descending order
+        errors_only (bool): Keep only rows with missing or invalid values
+        
+    Returns:
+        np.ndarray: Positions of the matching rows in display order
+    """
+    matches = errors.any(axis=1).to_numpy() if errors_only else np.ones(len(df_display), dtype=bool)
+    if search.strip():
+        found = np.zeros(len(df_display), dtype=bool)
+        for col in df_display.columns:
+            found |= df_display[col].str.contains(search.strip(), case=False, regex=False, na=False).to_numpy(dtype=bool)
+        matches &= found
+    if filter_column and filter_text.strip():
+        matches &= df_display[filter_column].str.contains(
+            filter_text.strip(), case=False, regex=False, na=False
+        ).to_numpy(dtype=bool)
+    
+    positions = np.flatnonzero(matches)
+    if sort_column:
+        values = pd.Series(df_display[sort_column].to_numpy()[positions], index=positions)
+        positions = values.sort_values(ascending=not descending, kind="stable").index.to_numpy()
+    return positions
+
+def _page_rows(df_display, page_positions, columns):
+    """
+    Get the rows of one page of the client table.
+    
+    A page of consecutive rows in stored order (no search, filter or sort)
+    is read with read_page, which with the record store queries only that
+    page and the selected columns. The table is normalized before paging,
+    so stored and displayed values are the same.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        page_positions (np.ndarray): Positions of the page's rows in df_display
+        columns (list): Columns to show
+        
+    Returns:
+        pd.DataFrame: Page rows with a RangeIndex from 0
+    """
+    if len(page_positions) and np.array_equal(page_positions, np.arange(page_positions[0], page_positions[0] + len(page_positions))):
+        return read_page("clients_df", int(page_positions[0]), len(page_positions), columns)
+    return df_display.iloc[page_positions][columns].reset_index(drop=True)
+
+def _client_position(client_id, expected):
+    """
+    Find the row of a client by ProviderClientId.
+    
+    Args:
+        client_id (str): ProviderClientId of the edited row
+        expected (int): Position the row had when the page was built, used
+            to pick between clients sharing an ID
+            
+    Returns:
+        int or None: Current position of the row, None if the client is gone
+    """
+    positions = record_index("clients_df", "ProviderClientId").get(client_id, [])
+    if expected in positions:
+        return expected
+    return positions[0] if positions else None
+
+def _apply_page_changes(df_display, page_ids, page_positions, changes):
+    """
+    Save the cells edited in one page of the paged client table.
+    
+    Edited rows are matched back to the client data by ProviderClientId.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        page_ids (np.ndarray): ProviderClientId of each row of the page
+        page_positions (np.ndarray): Position of each row of the page in df_display
+        changes (dict): Editor state with "edited_rows"
+        
+    Returns:
+        bool: True if anything was saved
+    """
+    edited_rows = {}
+    for row, edits in changes.get("edited_rows", {}).items():
+        row = int(row)
+        if row >= len(page_ids):
+            continue
+        position = _client_position(page_ids[row], int(page_positions[row]))
+        if position is not None:
+            edited_rows[position] = edits
+    
+    return _save_changes(df_display, _clean_edits(df_display, edited_rows))
+
+def _client_column_config():
+    """Column settings of the client data editor."""
+    return {
+        "ProviderClientId": st.column_config.TextColumn(
+            "Provider Client ID",
+            help="Unique identifier for the client",
+            required=True,
+            default=""
+        ),
+        "FirstName": st.column_config.TextColumn(
+            "First Name",
+            help="Client's first name",
+            required=True,
+            default=""
+        ),
+        "LastName": st.column_config.TextColumn(
+            "Last Name",
+            help="Client's last name",
+            required=True,
+            default=""
+        ),
+        "DateofBirth": st.column_config.TextColumn(
+            "Date of Birth",
+            help="Format: MM/DD/YYYY",
+            required=True,
+            default=""
+        ),
+        "Gender": st.column_config.SelectboxColumn(
+            "Gender",
+            help="Select client's gender",
+            options=list(GENDER_OPTIONS.keys()),
+            required=True,
+            default="Unknown"
+        ),
+        "ZipCode": st.column_config.TextColumn(
+            "Zip Code",
+            help="5-digit zip code (will be formatted to 9 digits)",
+            required=False,
+            default=""
+        ),
+        ISSUES_COLUMN: st.column_config.TextColumn(
+            "Issues",
+            help="Fields with missing or invalid values",
+            disabled=True
+        )
+    }
+
+def _show_bulk_operations(df_display, errors):
+    """
+    Change many cells of one column in a single step.
+    
+    The selected rows are transformed with vectorized pandas operations and
+    all changed cells are saved as one undoable change.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        errors (pd.DataFrame): Error mask of the client data
+    """
+    result = st.session_state.pop("bulk_operation_result", None)
+    with st.expander("Bulk operations", expanded=result is not None):
+        if result:
+            st.success(result)
+        
+        columns = list(df_display.columns)
+        operation = st.selectbox("Operation", BULK_OPERATIONS, key="bulk_operation")
+        default_column = {"Format ZIP codes": "ZipCode", "Format dates": "DateofBirth"}.get(operation)
+        
+        with st.form("bulk_operation_form"):
+            column = st.selectbox(
+                "Column",
+                columns,
+                index=columns.index(default_column) if default_column in columns else 0
+            )
+            find, replace, case_sensitive, value = "", "", True, ""
+            if operation == "Find and replace":
+                find = st.text_input("Find (regular expression)")
+                replace = st.text_input("Replace with", help="Use \\1, \\2, ... to insert matched groups")
+                case_sensitive = st.checkbox("Case sensitive", value=True)
+            elif operation == "Fill":
+                value = st.text_input("Value")
+            else:
+                st.caption("Values that cannot be formatted become empty.")
+            
+            st.markdown("**Rows to change**")
+            filter_col, pattern_col = st.columns(2)
+            with filter_col:
+                filter_column = st.selectbox("Only rows where", [None] + columns,
+                                             format_func=lambda col: "(all rows)" if col is None else col)
+            with pattern_col:
+                filter_pattern = st.text_input("matches (regular expression)")
+            blank_only = st.checkbox("Only blank cells")
+            errors_only = st.checkbox("Only cells that fail validation")
+            
+            submitted = st.form_submit_button("Apply")
+        
+        if not submitted:
+            return
+        if operation == "Find and replace" and not find:
+            st.error("Enter the text to find.")
+            return
+        for pattern in (find, filter_pattern):
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                st.error(f"Invalid regular expression '{pattern}': {e}")
+                return
+        
+        error_rows = None
+        if errors_only:
+            error_rows = errors[column].to_numpy() if column in errors.columns else np.zeros(len(df_display), dtype=bool)
+        rows = select_rows(df_display, column, filter_column, filter_pattern, blank_only, error_rows)
+        new_values = transform_column(df_display[column], operation, find, replace, case_sensitive, value)
+        updates = bulk_updates(df_display[column], rows, new_values)
+        
+        if not updates:
+            st.info(f"No cells changed ({int(rows.sum())} rows selected).")
+            return
+        _save_changes(df_display, updates, label=f"{operation.lower()} in {column}")
+        st.session_state.bulk_operation_result = (
+            f"Changed {len(updates)} cells in {column} ({int(rows.sum())} rows selected)."
+        )
+        st.rerun()
+
+def _show_full_table(df_display, errors, column_config):
+    """
+    Edit the whole client table, including adding and deleting rows.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        errors (pd.DataFrame): Error mask of the client data
+        column_config (dict): Column settings of the editor
+    """
+    st.data_editor(
+        df_display.assign(**{ISSUES_COLUMN: _issue_text(errors)}),
+        column_config=column_config,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key="client_data_editor"
+    )
+    
+    # Validate and save only the rows changed in the editor, then show the saved values
+    changes = st.session_state.get("client_data_editor")
+    if changes and _apply_editor_changes(df_display, changes):
+        st.rerun()
+
+def _show_paged_table(df_display, errors, column_config, errors_only):
+    """
+    Edit the client table one page at a time.
+    
+    Search, filter and sort run on the server and only the visible page of
+    the selected columns is sent to the browser. Invalid cells are listed
+    in a highlighted issues column.
+    
+    Args:
+        df_display (pd.DataFrame): Normalized client data
+        errors (pd.DataFrame): Error mask of the client data
+        column_config (dict): Column settings of the editor
+        errors_only (bool): Show only rows with missing or invalid values
+    """
+    all_columns = list(df_display.columns)
+    columns = st.multiselect(
+        "Columns",
+        all_columns,
+        default=[col for col in column_config if col in all_columns],
+        key="client_table_columns"
+    ) or all_columns
+    
+    search_col, filter_col, filter_text_col, sort_col, order_col = st.columns([3, 2, 2, 2, 1])
+    with search_col:
+        search = st.text_input("Search", key="client_table_search", placeholder="Text in any column")
+    with filter_col:
+        filter_column = st.selectbox("Filter column", [None] + all_columns, key="client_table_filter_column",
+                                     format_func=lambda col: "(none)" if col is None else col)
+    with filter_text_col:
+        filter_text = st.text_input("Contains", key="client_table_filter_text")
+    with sort_col:
+        sort_column = st.selectbox("Sort by", [None] + all_columns, key="client_table_sort",
+                                   format_func=lambda col: "(stored order)" if col is None else col)
+    with order_col:
+        descending = st.checkbox("Desc.", key="client_table_descending")
+    
+    # The row order is kept until the data or the query changes
+    params = (search, filter_column, filter_text, sort_column, descending, errors_only)
+    order = memoize("client_page_order", ["clients_df"], lambda: None)
+    if order is None or order["params"] != params:
+        order = {"params": params, "positions": _page_order(df_display, errors, *params)}
+        prime_memo("client_page_order", ["clients_df"], order)
+    positions = order["positions"]
+    
+    page_count = max(1, -(-len(positions) // CLIENT_TABLE_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key="client_table_page")
+    page = min(int(page), page_count)
+    page_positions = positions[(page - 1) * CLIENT_TABLE_PAGE_SIZE:page * CLIENT_TABLE_PAGE_SIZE]
+    
+    first_row = (page - 1) * CLIENT_TABLE_PAGE_SIZE + 1 if len(page_positions) else 0
+    st.caption(
+        f"Showing {first_row}-{first_row + len(page_positions) - 1 if len(page_positions) else 0} "
+        f"of {len(positions)} matching clients ({len(df_display)} total)."
+    )
+    
+    page_df = _page_rows(df_display, page_positions, columns)
+    page_df[ISSUES_COLUMN] = _issue_text(errors.iloc[page_positions])
+    page_ids = df_display["ProviderClientId"].to_numpy()[page_positions]
+    
+    # A new key per page, query and data version starts each page with a clean change set
+    editor_key = f"client_page_editor_{hash(params + (page, tuple(columns), dataset_version('clients_df')))}"
+    st.data_editor(
+        page_df.style.map(lambda issues: ISSUES_STYLE if issues else "", subset=[ISSUES_COLUMN]),
+        column_config={col: config for col, config in column_config.items() if col in page_df.columns},
+        num_rows="fixed",
+        use_container_width=True,
+        hide_index=True,
+        key=editor_key
+    )
+    
+    changes = st.session_state.get(editor_key)
+    if changes and _apply_page_changes(df_display, page_ids, page_positions, changes):
+        st.rerun()
 
 def show_data_table_page():
     """Display and handle the data table UI."""
     st.header("Client Data Table")
     st.markdown("Edit client data below. Changes will be automatically saved.")
     
-    if not st.session_state.clients_df.empty:
-        # Ensure all columns are string type and handle empty values before displaying
-        df_display = st.session_state.clients_df.copy()
-        df_display = df_display.fillna('')
-        for col in df_display.columns:
-            df_display[col] = df_display[col].astype(str).replace('nan', '')
-        
-        # Configure column options for the data editor
-        column_config = {
-            "ProviderClientId": st.column_config.TextColumn(
-                "Provider Client ID",
-                help="Unique identifier for the client",
-                required=True,
-                default=""
-            ),
-            "FirstName": st.column_config.TextColumn(
-                "First Name",
-                help="Client's first name",
-                required=True,
-                default=""
-            ),
-            "LastName": st.column_config.TextColumn(
-                "Last Name",
-                help="Client's last name",
-                required=True,
-                default=""
-            ),
-            "DateofBirth": st.column_config.TextColumn(
-                "Date of Birth",
-                help="Format: MM/DD/YYYY",
-                required=True,
-                default=""
-            ),
-            "Gender": st.column_config.SelectboxColumn(
-                "Gender",
-                help="Select client's gender",
-                options=list(GENDER_OPTIONS.keys()),
-                required=True,
-                default="Unknown"
-            ),
-            "ZipCode": st.column_config.TextColumn(
-                "Zip Code",
-                help="5-digit zip code (will be formatted to 9 digits)",
-                required=False,
-                default=""
+    if dataset_length("clients_df"):
+        # Text conversion and validation of the whole table only run after the
+        # client data changed outside this editor (ingestion, record creation, undo)
+        normalized = memoize("client_display", ["clients_df"], _normalized_clients)
+        df_display = normalized["frame"]
+        
+        if normalized["changed"]:
+            # Save the normalized table once so later edits can be patched into it.
+            # Only the way values are written changes, so this is not an undo step.
+            store_normalized("clients_df", df_display)
+            prime_memo("client_display", ["clients_df"], {"frame": df_display, "changed": False})
+        
+        errors = _client_errors(df_display)
+        _show_error_summary(errors)
+        _show_bulk_operations(df_display, errors)
+        
+        column_config = _client_column_config()
+        
+        toggle_col, errors_col = st.columns(2)
+        with toggle_col:
+            paged = st.toggle(
+                "Paged view",
+                value=len(df_display) > CLIENT_TABLE_PAGED_ROWS,
+                key="client_table_paged",
+                help="Search, sort and edit one page at a time. Rows can only be added or deleted in the full table."
+            )
+        with errors_col:
+            errors_only = st.checkbox(
+                "Only rows with errors",
+                key="client_table_errors_only",
+                help="Uses the paged view"
             )
-        }
-        
-        # Create the data editor
-        edited_df = st.data_editor(
-            df_display,
-            column_config=column_config,
-            num_rows="dynamic",
-            use_container_width=True,
-            hide_index=True,
-            key="client_data_editor"
-        )
         
-        # Validate and update the edited dataframe
-        if edited_df is not None and not edited_df.empty:
-            # Format and validate DateofBirth
-            invalid_dates = []
-            formatted_dates = []
-            
-            for idx, row in edited_df.iterrows():
-                date_str = row.get('DateofBirth', '').strip()
-                if not date_str:  # Allow empty dates
-                    formatted_dates.append('')
-                elif not validate_date(date_str):
-                    invalid_dates.append(idx)
-                    formatted_dates.append('')
-                else:
-                    formatted_dates.append(format_date(date_str))
-            
-            if invalid_dates:
-                st.error(f"Invalid date format detected in {len(invalid_dates)} rows. Please use M/DD/YYYY or MM/DD/YYYY format for non-empty dates.")
-            
-            # Update the dates in the DataFrame
-            edited_df['DateofBirth'] = formatted_dates
-            
-            # Format ZipCode
-            edited_df['ZipCode'] = edited_df['ZipCode'].apply(validate_zip)
-            
-            # Update session state with validated data
-            st.session_state.clients_df = edited_df
+        if paged or errors_only:
+            _show_paged_table(df_display, errors, column_config, errors_only)
+        else:
+            _show_full_table(df_display, errors, column_config)
     else:
         st.info("No client data loaded. Please go to the Data Ingestion page to upload data.")
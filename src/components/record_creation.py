@@ -4,32 +4,32 @@ Record creation component for creating new client records.
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from src.config import GENDER_OPTIONS, PROVIDERID, PROVIDERLOCATIONID
+from src.config import (
+    ADMISSION_COLUMNS, CLIENT_SEARCH_LIMIT, DISCHARGE_COLUMNS, DISCHARGE_OPTION_LIMIT, GENDER_OPTIONS, PROVIDERID,
+    PROVIDERLOCATIONID
+)
 from src.data_models import validate_date, validate_zip, generate_admission_id
 from src.survey_config import ADMISSION_SURVEY_QUESTIONS
-from src.utils.survey_engine import SurveyEngine
+from src.utils.client_search import build_client_search_index, client_label, search_clients
+from src.utils.dataset_store import (
+    append_records, column_values, dataset_length, find_records, get_dataset, journal_action, memoize, set_dataset
+)
+from src.utils.survey_engine import SurveyEngine, build_survey_rows
 
 def show_record_creation_page():
     """Display and handle the record creation UI."""
     st.header("Record Creation")
     
-    if not st.session_state.clients_df.empty:
+    if dataset_length("clients_df"):
         # Create tabs for different record creation workflows
         tab1, tab2 = st.tabs(["Create Client+Admission+Survey", "Create Discharge"])
         
         # Initialize DataFrames if not exist
         if "admissions_df" not in st.session_state:
-            st.session_state.admissions_df = pd.DataFrame(columns=[
-                "ProviderId", "ProviderClientId", "ProviderAdmissionId", "ProviderLocationId",
-                "AdmissionDate", "AdmissionType", "ServiceLevel", "ServiceCode", 
-                "DefaultPayerAccountID", "ReferralNumber", "PrimaryClinicianName", "FirstContactDate"
-            ])
+            st.session_state.admissions_df = pd.DataFrame(columns=ADMISSION_COLUMNS)
             
         if "discharges_df" not in st.session_state:
-            st.session_state.discharges_df = pd.DataFrame(columns=[
-                "ProviderId", "ProviderClientId", "ProviderAdmissionId", "DischargeDate",
-                "DischargeReason", "DischargeStatus"
-            ])
+            st.session_state.discharges_df = pd.DataFrame(columns=DISCHARGE_COLUMNS)
         
         # Create Client+Admission+Survey tab
         with tab1:
@@ -41,6 +41,19 @@ def show_record_creation_page():
     else:
         st.info("Please load client data first to create records.")
 
+def _client_search_index():
+    """
+    Return the client search index, rebuilding it only when clients_df changed.
+    
+    Returns:
+        dict: Index for search_clients
+    """
+    return memoize("client_search_index", ["clients_df"], lambda: build_client_search_index(
+        column_values("clients_df", "ProviderClientId"),
+        column_values("clients_df", "FirstName"),
+        column_values("clients_df", "LastName")
+    ))
+
 def show_client_admission_survey_form():
     """Display and handle the client+admission+survey form."""
     # Initialize session state for selected client
@@ -57,12 +70,18 @@ def show_client_admission_survey_form():
     
     # Handle client selection/input before the form
     if client_type == "Existing Client":
-        if not st.session_state.clients_df.empty:
-            # Create client options with name first
-            client_options_dict = {}
-            for _, row in st.session_state.clients_df.iterrows():
-                display_name = f"{row['FirstName']} {row['LastName']} (ID: {row['ProviderClientId']})"
-                client_options_dict[display_name] = row['ProviderClientId']
+        if dataset_length("clients_df"):
+            # Search the prebuilt index and list only the top matches
+            search_text = st.text_input("Search Clients", placeholder="Name or client ID", key="client_search")
+            client_options_dict = dict(search_clients(_client_search_index(), search_text, CLIENT_SEARCH_LIMIT))
+            
+            # Keep the current selection available while the search text changes
+            if st.session_state.selected_client_data:
+                client_data = st.session_state.selected_client_data
+                selected_label = client_label(
+                    client_data['ProviderClientId'], client_data['FirstName'], client_data['LastName']
+                )
+                client_options_dict.setdefault(selected_label, client_data['ProviderClientId'])
             
             # Create sorted list of options
             client_options = sorted(client_options_dict.keys())
@@ -79,9 +98,9 @@ def show_client_admission_survey_form():
                 if client_id != st.session_state.selected_client_id:
                     # Update session state with new selection
                     st.session_state.selected_client_id = client_id
-                    st.session_state.selected_client_data = st.session_state.clients_df[
-                        st.session_state.clients_df['ProviderClientId'] == client_id
-                    ].iloc[0].to_dict()
+                    st.session_state.selected_client_data = find_records(
+                        "clients_df", "ProviderClientId", client_id
+                    ).iloc[0].to_dict()
             else:
                 st.session_state.selected_client_id = None
                 st.session_state.selected_client_data = None
@@ -146,11 +165,8 @@ def show_client_admission_survey_form():
                         default_admission_date = st.session_state.selected_client_data['AdmissionDate']
                     
                     # If not found, try to get admission date from admissions DataFrame
-                    elif 'admissions_df' in st.session_state and not st.session_state.admissions_df.empty:
-                        # Force client ID to string for comparison
-                        # Use the isin method for more reliable matching
-                        mask = st.session_state.admissions_df['ProviderClientId'].astype(str).isin([str(client_id)])
-                        client_admissions = st.session_state.admissions_df[mask]
+                    elif dataset_length("admissions_df"):
+                        client_admissions = find_records("admissions_df", "ProviderClientId", client_id).copy()
                         
                         if not client_admissions.empty and 'AdmissionDate' in client_admissions.columns:
                             # Sort by admission date to get the most recent
@@ -218,7 +234,10 @@ def show_client_admission_survey_form():
                     }
                 
                 # Generate admission ID with client name and admission date
-                admission_id = generate_admission_id(client_id, first_name, last_name, admission_date)
+                existing_admission_ids = set(column_values("admissions_df", "ProviderAdmissionId"))
+                admission_id = generate_admission_id(
+                    client_id, first_name, last_name, admission_date, existing_ids=existing_admission_ids
+                )
                 
                 # Create admission record with all required fields
                 new_admission = {
@@ -236,11 +255,12 @@ def show_client_admission_survey_form():
                     "FirstContactDate": first_contact_date
                 }
                 
-                # Add records to DataFrames
-                if client_type == "New Client":
-                    st.session_state.clients_df = pd.concat([st.session_state.clients_df, pd.DataFrame([new_client])], ignore_index=True)
-                
-                st.session_state.admissions_df = pd.concat([st.session_state.admissions_df, pd.DataFrame([new_admission])], ignore_index=True)
+                # Queue records; they are added to the DataFrames when next read
+                with journal_action(f"admission for {first_name} {last_name}"):
+                    if client_type == "New Client":
+                        append_records("clients_df", [new_client])
+                    
+                    append_records("admissions_df", [new_admission])
                 
                 # Store admission ID in session state for survey tab
                 st.session_state.current_admission_id = admission_id
@@ -313,8 +333,8 @@ def show_client_admission_survey_form():
                         )
                         
                         # CSV export for all survey data
-                        if 'survey_df' in st.session_state and not st.session_state.survey_df.empty:
-                            csv_data = st.session_state.survey_df.to_csv(index=False)
+                        if dataset_length("survey_df"):
+                            csv_data = get_dataset("survey_df").to_csv(index=False)
                             st.download_button(
                                 label="Download All Survey Data (CSV)",
                                 data=csv_data,
@@ -329,12 +349,13 @@ def show_client_admission_survey_form():
                 st.subheader("Export All Survey Data")
                 
                 # Show all survey data
-                if 'survey_df' in st.session_state and not st.session_state.survey_df.empty:
-                    st.write(f"Total survey records: {len(st.session_state.survey_df)}")
-                    st.dataframe(st.session_state.survey_df)
+                if dataset_length("survey_df"):
+                    survey_df = get_dataset("survey_df")
+                    st.write(f"Total survey records: {len(survey_df)}")
+                    st.dataframe(survey_df)
                     
                     # Export all survey data
-                    csv_data = st.session_state.survey_df.to_csv(index=False)
+                    csv_data = survey_df.to_csv(index=False)
                     st.download_button(
                         label="Download All Survey Data (CSV)",
                         data=csv_data,
@@ -345,7 +366,8 @@ def show_client_admission_survey_form():
                     
                     # Add a button to clear all survey data
                     if st.button("Clear All Survey Data"):
-                        st.session_state.survey_df = pd.DataFrame()
+                        with journal_action("survey data clear"):
+                            set_dataset("survey_df", pd.DataFrame())
                         st.success("All survey data cleared.")
                         st.rerun()
                 else:
@@ -378,44 +400,21 @@ def show_client_admission_survey_form():
                         st.session_state.survey_answers[admission_id] = formatted_answers
                         
                         # Create survey answers dataframe in the correct format (one row per question)
-                        survey_rows = []
-                        
-                        for seq_num, value in formatted_answers.items():
-                            # Skip empty answers
-                            if value == "":
-                                continue
-                                
-                            survey_row = {
-                                "RecordType": "SurAns",
-                                "ProviderId": PROVIDERID,
-                                "ProviderClientId": client_id,
-                                "ProviderAdmissionId": admission_id,
-                                "QuestionGroupId": "1",  # 1 for Admission
-                                "ExportSequenceNumber": seq_num,
-                                "AnswerValue": value
-                            }
-                            survey_rows.append(survey_row)
-                        
-                        # Add to survey dataframe
-                        if 'survey_df' not in st.session_state:
-                            st.session_state.survey_df = pd.DataFrame()
+                        survey_rows = build_survey_rows(client_id, admission_id, formatted_answers)
                         
+                        # Queue for the survey dataframe
                         if survey_rows:  # Only add if there are answers
-                            st.session_state.survey_df = pd.concat([
-                                st.session_state.survey_df, 
-                                pd.DataFrame(survey_rows)
-                            ], ignore_index=True)
+                            with journal_action(f"survey answers for {admission_id}"):
+                                append_records("survey_df", survey_rows)
                         
                         # Show success message with count of questions answered
                         st.success(f"Successfully saved {len(survey_rows)} survey answers.")
                         
                         # Display the survey data
-                        if 'survey_df' in st.session_state and not st.session_state.survey_df.empty:
+                        if survey_rows:
                             with st.expander("View Saved Survey Data"):
-                                # Filter to show only this admission's data
-                                admission_data = st.session_state.survey_df[
-                                    st.session_state.survey_df["ProviderAdmissionId"] == admission_id
-                                ]
+                                # Show only this admission's data
+                                admission_data = pd.DataFrame(survey_rows)
                                 if not admission_data.empty:
                                     st.dataframe(admission_data)
                     else:
@@ -428,31 +427,81 @@ def show_client_admission_survey_form():
         else:
             st.warning("Please create an admission record first in the Basic Information tab.")
 
+def _build_admission_options(open_only):
+    """
+    Build the discharge dropdown entries.
+    
+    Client names are joined to admissions with one merge on ProviderClientId
+    and the option text is built with vectorized string concatenation.
+    
+    Args:
+        open_only (bool): Leave out admissions that already have a discharge
+        
+    Returns:
+        pd.DataFrame: Columns text, admission_id and client_id, in admission order
+    """
+    admissions_df = get_dataset("admissions_df", columns=["ProviderClientId", "ProviderAdmissionId", "AdmissionDate"])
+    if open_only:
+        # Anti-join: keep admissions without a discharge record
+        discharged_ids = column_values("discharges_df", "ProviderAdmissionId")
+        admissions_df = admissions_df[~admissions_df["ProviderAdmissionId"].isin(discharged_ids)]
+    
+    # First record per client supplies the name, as in the client lookup
+    client_names = get_dataset("clients_df", columns=["ProviderClientId", "FirstName", "LastName"]).drop_duplicates(
+        subset="ProviderClientId", keep="first"
+    )
+    merged = admissions_df.merge(client_names, on="ProviderClientId", how="left", indicator=True)
+    
+    client_name = (merged["FirstName"].astype(str) + " " + merged["LastName"].astype(str)).where(
+        merged["_merge"] == "both", "Unknown"
+    )
+    options = pd.DataFrame({
+        "text": client_name + " - " + merged["ProviderAdmissionId"].astype(str) + " - " + merged["AdmissionDate"].astype(str),
+        "admission_id": merged["ProviderAdmissionId"],
+        "client_id": merged["ProviderClientId"]
+    })
+    return options
+
+def _admission_options(open_only):
+    """
+    Return the discharge dropdown entries, cached until the datasets they read change.
+    
+    Args:
+        open_only (bool): Leave out admissions that already have a discharge
+        
+    Returns:
+        pd.DataFrame: Result of _build_admission_options; do not modify
+    """
+    datasets = ["admissions_df", "clients_df"] + (["discharges_df"] if open_only else [])
+    return memoize(("admission_options", open_only), datasets, lambda: _build_admission_options(open_only))
+
 def show_discharge_form():
     """Display and handle the discharge form."""
+    admission_options = None
+    if dataset_length("admissions_df"):
+        # Filters sit outside the form so the dropdown updates as they change
+        filter_col, search_col = st.columns([1, 2])
+        with filter_col:
+            open_only = st.checkbox("Only admissions without a discharge", key="discharge_open_only")
+        with search_col:
+            search_text = st.text_input("Search Admissions", placeholder="Name, admission ID or date", key="discharge_search")
+        
+        admission_options = _admission_options(open_only)
+        if search_text.strip():
+            admission_options = admission_options[
+                admission_options["text"].str.contains(search_text.strip(), case=False, regex=False)
+            ]
+        
+        match_count = len(admission_options)
+        admission_options = admission_options.head(DISCHARGE_OPTION_LIMIT).to_dict("records")
+        if match_count > DISCHARGE_OPTION_LIMIT:
+            st.caption(f"Showing {DISCHARGE_OPTION_LIMIT} of {match_count} admissions. Search to narrow the list.")
+    
     with st.form("discharge_form"):
         st.subheader("Create Discharge Record")
         
         # If admissions exist, create a dropdown to select one
-        if not st.session_state.admissions_df.empty:
-            # Prepare options for the dropdown
-            admission_options = []
-            for _, row in st.session_state.admissions_df.iterrows():
-                client_id = row["ProviderClientId"]
-                admission_id = row["ProviderAdmissionId"]
-                admission_date = row["AdmissionDate"]
-                
-                # Find client name
-                client_name = "Unknown"
-                client_row = st.session_state.clients_df[st.session_state.clients_df["ProviderClientId"] == client_id]
-                if not client_row.empty:
-                    first_name = client_row.iloc[0]["FirstName"]
-                    last_name = client_row.iloc[0]["LastName"]
-                    client_name = f"{first_name} {last_name}"
-                
-                option_text = f"{client_name} - {admission_id} - {admission_date}"
-                admission_options.append({"text": option_text, "admission_id": admission_id, "client_id": client_id})
-            
+        if admission_options is not None:
             selected_admission = st.selectbox(
                 "Select Admission to Discharge",
                 options=range(len(admission_options)),
@@ -470,6 +519,10 @@ def show_discharge_form():
             submit_button = st.form_submit_button("Create Discharge Record")
             
             if submit_button:
+                if selected_admission is None:
+                    st.error("Please select an admission to discharge.")
+                    return
+                
                 if not validate_date(discharge_date):
                     st.error("Please enter a valid discharge date in MM/DD/YYYY format.")
                     return
@@ -486,8 +539,9 @@ def show_discharge_form():
                     "DischargeStatus": discharge_status
                 }
                 
-                # Add record to DataFrame
-                st.session_state.discharges_df = pd.concat([st.session_state.discharges_df, pd.DataFrame([new_discharge])], ignore_index=True)
+                # Queue record for the discharges DataFrame
+                with journal_action(f"discharge of {selected['admission_id']}"):
+                    append_records("discharges_df", [new_discharge])
                 
                 st.success("Successfully created discharge record.")
         else:
@@ -29,9 +29,96 @@ GENDER_OPTIONS = {
     "Unknown": 9
 }
 
+# Number of rows to read and normalize at a time during ingestion.
+# Caps peak memory for large uploads; set to None to read files in one pass.
+# Each chunk repeats per-column setup such as parsing its distinct dates, so
+# 50,000-row chunks take about 10% longer than one pass and 10,000-row chunks
+# about 50% longer; the results are the same either way.
+INGEST_CHUNK_SIZE = 50000
+
+# Only parse source columns that FIELD_MAPPING maps to an output field.
+# Unmapped columns (parent emails, referral fields, ...) are never loaded.
+INGEST_MAPPED_COLUMNS_ONLY = False
+
+# Parser backend for CSV/TSV ingestion: "c" (pandas C parser) or "pyarrow"
+# (multithreaded Arrow reader with pyarrow-backed string columns). The Arrow
+# reader parses whole files at once, so INGEST_CHUNK_SIZE does not apply to it.
+# Falls back to "c" when pyarrow is not installed.
+CSV_PARSER_ENGINE = "c"
+
+# Number of processed uploads kept per provider, keyed by a hash of the
+# upload contents. The cache is shared by all sessions of the server, so
+# reruns, re-uploads and other sessions opening the same roster skip parsing
+# and share one copy of the processed data.
+INGEST_CACHE_SIZE = 4
+
+# Uploads with fewer rows than the dataset divided by this ratio are merged by
+# looking up each incoming key, instead of hashing every key in the dataset.
+INDEXED_MERGE_RATIO = 100
+
+# Worker processes used to parse multiple uploaded files in parallel.
+# None uses one worker per CPU core.
+INGEST_MAX_WORKERS = None
+
+# Number of distinct date strings remembered by the date parser
+DATE_CACHE_SIZE = 4096
+
+# SQLite file the client, admission, survey and discharge datasets are kept in.
+# Data survives browser refreshes and is shared by all sessions of the app.
+# None keeps each session's data in memory only.
+RECORD_STORE_PATH = None
+
+# Memory the undo/redo history may hold, in MB. The oldest steps are dropped
+# once their stored row changes exceed it.
+UNDO_MEMORY_BUDGET_MB = 64
+
+# Memory the client, admission, survey and discharge data of one session may
+# use, in MB. Beyond it the least recently used datasets are written to disk
+# and read back when next used; datasets the current page uses are never
+# spilled. None never spills.
+SESSION_MEMORY_BUDGET_MB = 512
+
+# Directory for spilled datasets, which hold client data. It is created
+# readable by the server's user only, and a session's files are deleted when
+# the session ends or the server exits. None uses a "client_data_spill"
+# folder in the system temp directory.
+SPILL_DIRECTORY = None
+
+# Number of matching clients listed by the client search in record creation
+CLIENT_SEARCH_LIMIT = 50
+
+# Number of admissions listed at a time in the discharge dropdown
+DISCHARGE_OPTION_LIMIT = 100
+
+# Number of clients shown per page in the paged client table
+CLIENT_TABLE_PAGE_SIZE = 100
+
+# Client rosters with more rows than this open the data table in paged view,
+# which only sends the visible page to the browser
+CLIENT_TABLE_PAGED_ROWS = 5000
+
 # Required client fields
 REQUIRED_CLIENT_FIELDS = ["ProviderClientId", "FirstName", "LastName", "DateofBirth", "Gender", "ZipCode"]
 
+# Columns of admission records created in the app
+ADMISSION_COLUMNS = [
+    "ProviderId", "ProviderClientId", "ProviderAdmissionId", "ProviderLocationId",
+    "AdmissionDate", "AdmissionType", "ServiceLevel", "ServiceCode",
+    "DefaultPayerAccountID", "ReferralNumber", "PrimaryClinicianName", "FirstContactDate"
+]
+
+# Columns of discharge records
+DISCHARGE_COLUMNS = [
+    "ProviderId", "ProviderClientId", "ProviderAdmissionId", "DischargeDate",
+    "DischargeReason", "DischargeStatus"
+]
+
+# Columns of survey answer records (one row per answered question)
+SURVEY_COLUMNS = [
+    "RecordType", "ProviderId", "ProviderClientId", "ProviderAdmissionId",
+    "QuestionGroupId", "ExportSequenceNumber", "AnswerValue"
+]
+
 # Field mapping dictionary for standardization
 FIELD_MAPPING = {
     "unique id": "ProviderClientId",
@@ -67,5 +154,8 @@ FIELD_MAPPING = {
     "date admitted": "AdmissionDate",
     "dateadmitted": "AdmissionDate",
     "admission for state": "AdmissionDate",
-    "admissionforstate": "AdmissionDate"
+    "admissionforstate": "AdmissionDate",
+    # Provider of the record; PROVIDERID is used where the upload has none
+    "provider id": "ProviderId",
+    "providerid": "ProviderId"
 }
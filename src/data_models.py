@@ -3,9 +3,36 @@ Data models and validation functions for the application.
 """
 import re
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from src.config import DATE_CACHE_SIZE, GENDER_OPTIONS, REQUIRED_CLIENT_FIELDS
 
 # Date validation regex pattern (M/DD/YYYY or MM/DD/YYYY)
 DATE_PATTERN = r'^([1-9]|0[1-9]|1[0-2])/([0-9]|0[1-9]|[12][0-9]|3[01])/\d{4}$'
+DATE_REGEX = re.compile(DATE_PATTERN)
+
+# Output date format
+DATE_FORMAT = "%m/%d/%Y"
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date(date_str):
+    """
+    Parse a date string and return it as MM/DD/YYYY.
+    
+    Shared by format_date and validate_date. Roster dates repeat heavily,
+    so results are kept in a bounded cache.
+    
+    Args:
+        date_str (str): Date string in M/D/YYYY or MM/DD/YYYY format
+        
+    Returns:
+        str: Date string in MM/DD/YYYY format, or None if invalid
+    """
+    try:
+        return datetime.strptime(date_str, DATE_FORMAT).strftime(DATE_FORMAT)
+    except ValueError:
+        return None
 
 def format_date(date_str):
     """
@@ -17,20 +44,10 @@ def format_date(date_str):
     Returns:
         str: Date string in MM/DD/YYYY format, or empty string if invalid
     """
-    try:
-        if not date_str or not isinstance(date_str, str):
-            return ""
-        # Parse the date string
-        date_obj = datetime.strptime(date_str.strip(), "%m/%d/%Y")
-        # Format it consistently as MM/DD/YYYY
-        return date_obj.strftime("%m/%d/%Y")
-    except ValueError:
-        try:
-            # Try parsing with single digit month
-            date_obj = datetime.strptime(date_str.strip(), "%-m/%d/%Y")
-            return date_obj.strftime("%m/%d/%Y")
-        except ValueError:
-            return ""
+    if not date_str or not isinstance(date_str, str):
+        return ""
+    # strptime's %m and %d accept single-digit months and days
+    return _parse_date(date_str.strip()) or ""
 
 def validate_date(date_str):
     """
@@ -50,18 +67,79 @@ def validate_date(date_str):
     if not date_str.strip():
         return True
     
-    # First check if it matches our pattern
-    if not re.match(DATE_PATTERN, date_str):
-        return False
+    # Check the pattern, then that it is a real calendar date
+    return DATE_REGEX.match(date_str) is not None and _parse_date(date_str) is not None
+
+def _unique_values(series):
+    """
+    Factorize a Series so that per-value work is done once per distinct value.
     
-    # Then try to parse it to ensure it's a valid date
-    try:
-        month, day, year = map(int, date_str.split('/'))
-        # Check if it's a valid date
-        datetime(year, month, day)
-        return True
-    except (ValueError, TypeError):
-        return False
+    Args:
+        series (pd.Series): Input column
+        
+    Returns:
+        tuple: (codes, uniques) - position of each row in uniques, and the
+            distinct values as an object Series (missing values included)
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return codes, pd.Series(uniques, dtype=object)
+
+def format_date_series(series):
+    """
+    Format a column of date strings to MM/DD/YYYY, blanking invalid dates.
+    
+    Vectorized counterpart of format_date: distinct values are parsed with
+    pd.to_datetime using an explicit format and mapped back onto the column.
+    
+    Args:
+        series (pd.Series): Column of date strings
+        
+    Returns:
+        pd.Series: Formatted date strings
+    """
+    codes, uniques = _unique_values(series)
+    is_text = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+    stripped = uniques.where(is_text, '').str.strip()
+    
+    parsed = pd.to_datetime(stripped, format=DATE_FORMAT, errors='coerce')
+    formatted = parsed.dt.strftime(DATE_FORMAT).astype(object).where(parsed.notna(), '')
+    
+    # Dates pandas cannot represent (e.g. year 1500) fall back to the scalar parser
+    unparsed = parsed.isna() & stripped.ne('')
+    if unparsed.any():
+        formatted[unparsed] = stripped[unparsed].map(format_date)
+    
+    dtype = series.dtype if pd.api.types.is_string_dtype(series.dtype) else object
+    return pd.Series(formatted.to_numpy().take(codes), index=series.index, dtype=dtype)
+
+def validate_date_series(series):
+    """
+    Validate a column of date strings.
+    
+    Vectorized counterpart of validate_date: empty strings are valid,
+    missing and non-string values are not.
+    
+    Args:
+        series (pd.Series): Column of date strings
+        
+    Returns:
+        pd.Series: Boolean Series, True where the date is valid or empty
+    """
+    codes, uniques = _unique_values(series)
+    is_text = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+    values = uniques.where(is_text, '')
+    
+    is_blank = values.str.strip().eq('')
+    matches_pattern = values.str.match(DATE_PATTERN).astype(bool)
+    parsed = pd.to_datetime(values.where(matches_pattern, ''), format=DATE_FORMAT, errors='coerce')
+    valid = is_text & (is_blank | parsed.notna())
+    
+    # Pattern matches that pandas could not parse are checked by the scalar validator
+    unparsed = matches_pattern & parsed.isna()
+    if unparsed.any():
+        valid[unparsed] = values[unparsed].map(validate_date).astype(bool)
+    
+    return pd.Series(valid.to_numpy().take(codes), index=series.index, dtype=bool)
 
 def validate_zip(zip_str):
     """
@@ -85,7 +163,166 @@ def validate_zip(zip_str):
     else:
         return ""  # Invalid zip format
 
-def generate_admission_id(client_id, first_name=None, last_name=None, admission_date=None):
+def format_zip_series(series):
+    """
+    Format a column of zip codes to 9 digits.
+    
+    Vectorized counterpart of validate_zip: non-digits are removed, 5-digit
+    codes get 0000 appended and anything that is not 5 or 9 digits becomes
+    an empty string.
+    
+    Args:
+        series (pd.Series): Column of zip code strings
+        
+    Returns:
+        pd.Series: Formatted 9-digit zip codes
+    """
+    digits = series.astype(object).where(series.map(lambda value: isinstance(value, str)), '').astype(str)
+    digits = digits.str.replace(r'\D', '', regex=True)
+    lengths = digits.str.len()
+    formatted = digits.where(lengths.eq(9), (digits + "0000").where(lengths.eq(5), ''))
+    dtype = series.dtype if pd.api.types.is_string_dtype(series.dtype) else object
+    return formatted.astype(dtype)
+
+def client_error_mask(df):
+    """
+    Find the invalid cells of client records in one vectorized pass.
+    
+    A cell is invalid when a required field (REQUIRED_CLIENT_FIELDS) is
+    blank, the date of birth is not a M/DD/YYYY date, the zip code does not
+    have 5 or 9 digits, or the gender is not one of GENDER_OPTIONS.
+    
+    Args:
+        df (pd.DataFrame): Client records
+        
+    Returns:
+        pd.DataFrame: Boolean frame with one column per required field,
+            True where the cell is invalid
+    """
+    errors = {}
+    for col in REQUIRED_CLIENT_FIELDS:
+        if col in df.columns:
+            text = df[col].astype(object).where(df[col].notna(), '').astype(str).str.strip()
+        else:
+            text = pd.Series('', index=df.index, dtype=object)
+        
+        invalid = text.eq('')
+        if col == 'DateofBirth':
+            invalid |= ~validate_date_series(text)
+        elif col == 'ZipCode':
+            invalid |= format_zip_series(text).eq('')
+        elif col == 'Gender':
+            invalid |= ~text.isin(list(GENDER_OPTIONS))
+        errors[col] = invalid.to_numpy(dtype=bool)
+    return pd.DataFrame(errors, index=df.index)
+
+# Maximum length of a provider admission ID
+MAX_ADMISSION_ID_LENGTH = 15
+
+def _collision_suffix(counter):
+    """
+    Build an uppercase base-36 suffix used to make an admission ID unique.
+    
+    Args:
+        counter (int): Positive collision counter
+        
+    Returns:
+        str: Suffix such as "1", "9", "A", "Z", "10"
+    """
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    suffix = ""
+    while counter:
+        counter, remainder = divmod(counter, 36)
+        suffix = digits[remainder] + suffix
+    return suffix
+
+def resolve_admission_id_collisions(admission_ids, existing_ids=None):
+    """
+    Make admission IDs unique against each other and against existing IDs.
+    
+    The first occurrence of an ID keeps it unless it is already taken. Every
+    other occurrence gets a base-36 counter suffix, truncating the ID so it
+    stays within 15 characters. Resolution follows row order, so the same
+    input always produces the same IDs.
+    
+    Args:
+        admission_ids (pd.Series): Candidate admission IDs
+        existing_ids (set, optional): Admission IDs that are already in use; any
+            container supporting "in" (e.g. a dict keyed by ID) works, and it is
+            only looked up, never copied, so the cost follows the number of candidates
+        
+    Returns:
+        pd.Series: Unique admission IDs with the same index
+    """
+    existing = existing_ids if existing_ids is not None else ()
+    in_use = np.fromiter((candidate in existing for candidate in admission_ids), dtype=bool, count=len(admission_ids))
+    collides = admission_ids.duplicated(keep='first').to_numpy() | in_use
+    if not collides.any():
+        return admission_ids
+    
+    taken = set(admission_ids[~collides])
+    unique_ids = []
+    next_counter = {}
+    for candidate in admission_ids[collides]:
+        counter = next_counter.get(candidate, 1)
+        while True:
+            suffix = _collision_suffix(counter)
+            unique_id = candidate[:MAX_ADMISSION_ID_LENGTH - len(suffix)] + suffix
+            counter += 1
+            if unique_id not in taken and unique_id not in existing:
+                break
+        next_counter[candidate] = counter
+        taken.add(unique_id)
+        unique_ids.append(unique_id)
+    
+    resolved = admission_ids.copy()
+    resolved[collides] = pd.Series(unique_ids, index=admission_ids.index[collides], dtype=admission_ids.dtype)
+    return resolved
+
+def generate_admission_ids(client_ids, first_names=None, last_names=None, admission_dates=None, existing_ids=None):
+    """
+    Generate provider admission IDs for whole columns of client data.
+    
+    Uses the same format as generate_admission_id (last 4 of the client ID,
+    initials and YYMMDD admission date, max 15 characters), then resolves
+    collisions within the batch and against existing_ids.
+    
+    Args:
+        client_ids (pd.Series): Provider client IDs
+        first_names (pd.Series, optional): Client first names
+        last_names (pd.Series, optional): Client last names
+        admission_dates (pd.Series, optional): Admission dates in MM/DD/YYYY format
+        existing_ids (set, optional): Admission IDs that are already in use
+        
+    Returns:
+        pd.Series: Generated provider admission IDs with the same index as client_ids
+    """
+    client_ids = pd.Series(client_ids, dtype=object).fillna('').astype(str)
+    index = client_ids.index
+    
+    def as_column(values):
+        if values is None:
+            return pd.Series('', index=index, dtype=object)
+        return pd.Series(values, dtype=object).set_axis(index).fillna('').astype(str)
+    
+    first_names = as_column(first_names)
+    last_names = as_column(last_names)
+    admission_dates = as_column(admission_dates)
+    
+    # Initials only when both names are present
+    has_names = first_names.ne('') & last_names.ne('')
+    initials = (first_names.str[:1] + last_names.str[:1]).str.upper().where(has_names, '')
+    
+    # Admission date as YYMMDD, or today's date when missing or invalid
+    has_date = admission_dates.ne('') & validate_date_series(admission_dates)
+    formatted = format_date_series(admission_dates.where(has_date, ''))
+    date_part = formatted.str[8:10] + formatted.str[0:2] + formatted.str[3:5]
+    date_part = date_part.where(has_date, datetime.now().strftime("%y%m%d"))
+    
+    admission_ids = (client_ids.str[-4:] + initials + date_part).str[:MAX_ADMISSION_ID_LENGTH]
+    return resolve_admission_id_collisions(admission_ids.astype(object), existing_ids)
+
+def generate_admission_id(client_id, first_name=None, last_name=None, admission_date=None, existing_ids=None):
     """
     Generate a provider admission ID based on client info and admission date.
     Format: Alphanumeric ID using name initials and date, max 15 characters
@@ -95,6 +332,7 @@ def generate_admission_id(client_id, first_name=None, last_name=None, admission_
         first_name (str, optional): Client's first name
         last_name (str, optional): Client's last name
         admission_date (str, optional): Admission date in MM/DD/YYYY format
+        existing_ids (set, optional): Admission IDs that are already in use
         
     Returns:
         str: Generated provider admission ID, no longer than 15 characters
@@ -108,7 +346,7 @@ def generate_admission_id(client_id, first_name=None, last_name=None, admission_
     if admission_date and validate_date(admission_date):
         try:
             # Try to parse the admission date
-            date_obj = datetime.strptime(admission_date, "%m/%d/%Y")
+            date_obj = datetime.strptime(admission_date, DATE_FORMAT)
             date_str = date_obj.strftime("%y%m%d")  # Short year format (2 digits)
         except ValueError:
             # If parsing fails, use current date
@@ -123,7 +361,11 @@ def generate_admission_id(client_id, first_name=None, last_name=None, admission_
     admission_id = f"{client_id_part}{initials}{date_str}"
     
     # Ensure it's no longer than 15 characters
-    if len(admission_id) > 15:
-        admission_id = admission_id[:15]
+    if len(admission_id) > MAX_ADMISSION_ID_LENGTH:
+        admission_id = admission_id[:MAX_ADMISSION_ID_LENGTH]
+    
+    # Make the ID unique if it is already taken
+    if existing_ids and admission_id in existing_ids:
+        admission_id = resolve_admission_id_collisions(pd.Series([admission_id]), existing_ids).iloc[0]
     
     return admission_id
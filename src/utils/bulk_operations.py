@@ -0,0 +1,78 @@
+"""
+Vectorized bulk edits of one column of the client table.
+"""
+import numpy as np
+import pandas as pd
+from src.data_models import format_date_series, format_zip_series
+
+# Operations offered by the bulk operations panel
+BULK_OPERATIONS = ["Find and replace", "Fill", "Format ZIP codes", "Format dates"]
+
+def select_rows(df, column, filter_column=None, filter_pattern="", blank_only=False, error_rows=None):
+    """
+    Choose the rows a bulk operation applies to.
+
+    Args:
+        df (pd.DataFrame): Client data with text columns
+        column (str): Column the operation changes
+        filter_column (str, optional): Column filter_pattern is matched against
+        filter_pattern (str): Regular expression the filter column must contain a match of
+        blank_only (bool): Keep only rows where column is blank
+        error_rows (np.ndarray, optional): Boolean mask of rows to keep, e.g.
+            rows where column failed validation
+
+    Returns:
+        np.ndarray: Boolean mask of the selected rows
+    """
+    rows = np.ones(len(df), dtype=bool)
+    if filter_column and filter_pattern:
+        rows &= df[filter_column].str.contains(filter_pattern, regex=True, na=False).to_numpy(dtype=bool)
+    if blank_only:
+        rows &= df[column].str.strip().eq('').to_numpy(dtype=bool)
+    if error_rows is not None:
+        rows &= error_rows
+    return rows
+
+def transform_column(series, operation, find="", replace="", case_sensitive=True, value=""):
+    """
+    Compute the new values of a column for a bulk operation.
+
+    Args:
+        series (pd.Series): Current text values
+        operation (str): One of BULK_OPERATIONS
+        find (str): Regular expression to replace ("Find and replace")
+        replace (str): Replacement, may use \\1 style group references ("Find and replace")
+        case_sensitive (bool): Match find case-sensitively ("Find and replace")
+        value (str): Value to write ("Fill")
+
+    Returns:
+        pd.Series: New values for every row; callers keep only the selected ones
+    """
+    if operation == "Find and replace":
+        return series.str.replace(find, replace, regex=True, case=case_sensitive)
+    if operation == "Fill":
+        return pd.Series(value, index=series.index, dtype=series.dtype)
+    if operation == "Format ZIP codes":
+        # Same rules as validate_zip: invalid codes become empty
+        return format_zip_series(series)
+    if operation == "Format dates":
+        # Same rules as format_date: invalid dates become empty
+        return format_date_series(series)
+    raise ValueError(f"Unknown bulk operation: {operation}")
+
+def bulk_updates(series, rows, new_values):
+    """
+    Collect the cells a bulk operation changes.
+
+    Args:
+        series (pd.Series): Current values of the column
+        rows (np.ndarray): Boolean mask of the selected rows
+        new_values (pd.Series): Result of transform_column
+
+    Returns:
+        dict: Row position -> {column: new value}, for update_cells
+    """
+    changed = rows & (new_values.to_numpy(dtype=object) != series.to_numpy(dtype=object))
+    positions = np.flatnonzero(changed)
+    values = new_values.to_numpy(dtype=object)[positions]
+    return {int(position): {series.name: value} for position, value in zip(positions, values)}
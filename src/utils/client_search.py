@@ -0,0 +1,87 @@
+"""
+Prefix search over client names and IDs for the client selector.
+"""
+import heapq
+from bisect import bisect_left
+
+def client_label(client_id, first_name, last_name):
+    """
+    Format the selector text of a client.
+
+    Args:
+        client_id: ProviderClientId
+        first_name: First name
+        last_name: Last name
+
+    Returns:
+        str: Display text, e.g. "John Smith (ID: 123)"
+    """
+    return f"{first_name} {last_name} (ID: {client_id})"
+
+def build_client_search_index(client_ids, first_names, last_names):
+    """
+    Build a prefix index over the words of each client's name and ID.
+
+    Args:
+        client_ids (list): ProviderClientId values
+        first_names (list): FirstName values, aligned with client_ids
+        last_names (list): LastName values, aligned with client_ids
+
+    Returns:
+        dict: Search index for search_clients
+    """
+    labels = [client_label(*values) for values in zip(client_ids, first_names, last_names)]
+
+    # Alphabetical rank of each label, used to order results
+    order = sorted(range(len(labels)), key=labels.__getitem__)
+    rank = [0] * len(labels)
+    for position, label_position in enumerate(order):
+        rank[label_position] = position
+
+    tokens = sorted(
+        (word, position)
+        for position, values in enumerate(zip(client_ids, first_names, last_names))
+        for value in values
+        for word in str(value).lower().split()
+    )
+
+    return {
+        "labels": labels,
+        "client_ids": list(client_ids),
+        "order": order,
+        "rank": rank,
+        "words": [word for word, _ in tokens],
+        "positions": [position for _, position in tokens]
+    }
+
+def _prefix_matches(index, prefix):
+    """Return the positions of clients with a word starting with prefix."""
+    words = index["words"]
+    start = bisect_left(words, prefix)
+    end = bisect_left(words, prefix + "\uffff", lo=start)
+    return set(index["positions"][start:end])
+
+def search_clients(index, query, limit):
+    """
+    Find clients whose name or ID words start with every word of the query.
+
+    Args:
+        index (dict): Result of build_client_search_index
+        query (str): Search text, e.g. "jo smi" or an ID prefix
+        limit (int): Maximum number of results
+
+    Returns:
+        list: (label, client_id) tuples in alphabetical order of label
+    """
+    query_words = query.lower().split()
+    if not query_words:
+        positions = index["order"][:limit]
+    else:
+        matches = _prefix_matches(index, query_words[0])
+        for word in query_words[1:]:
+            if not matches:
+                break
+            matches &= _prefix_matches(index, word)
+        positions = heapq.nsmallest(limit, matches, key=index["rank"].__getitem__)
+
+    return [(index["labels"][position], index["client_ids"][position]) for position in positions]
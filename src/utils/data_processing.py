@@ -1,13 +1,106 @@
 """
 Utility functions for data processing operations.
 """
+import io
+import os
 import pandas as pd
-from src.config import FIELD_MAPPING, REQUIRED_CLIENT_FIELDS
+from src.config import FIELD_MAPPING, PROVIDERID, REQUIRED_CLIENT_FIELDS
+from src.data_models import format_date_series, format_zip_series, validate_date_series
+
+# Values read as missing by the Arrow parser, matching pandas' defaults
+ARROW_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+def _as_string(series):
+    """
+    Convert a column to strings, keeping columns that already use a string dtype.
+    
+    Pyarrow-backed string columns are left as they are instead of being
+    copied into Python objects.
+    
+    Args:
+        series (pd.Series): Input column
+        
+    Returns:
+        pd.Series: Column of strings
+    """
+    if isinstance(series.dtype, (pd.StringDtype, pd.ArrowDtype)) and pd.api.types.is_string_dtype(series.dtype):
+        return series
+    return series.astype(str)
+
+def _format_id_column(series):
+    """
+    Strip decimal points from numeric ID values (e.g. "123.0" -> "123").
+    
+    Args:
+        series (pd.Series): ID column with NaN values already replaced by ''
+        
+    Returns:
+        pd.Series: ID column as strings
+    """
+    values = _as_string(series)
+    stripped = values.str.strip()
+    numbers = pd.to_numeric(stripped, errors='coerce')
+    if isinstance(numbers.dtype, pd.ArrowDtype):
+        numbers = numbers.astype('float64')
+    
+    # Integers that fit in int64 are converted in one pass; anything else
+    # (huge numbers, non-numeric IDs) goes through the scalar conversion
+    fits_int64 = numbers.notna() & (numbers.abs() < 2**63)
+    result = values.copy()
+    if fits_int64.any():
+        result[fits_int64] = numbers[fits_int64].astype('int64').astype(str)
+    
+    remaining = stripped.ne('') & ~fits_int64
+    if remaining.any():
+        result[remaining] = values[remaining].map(_format_id_value)
+    
+    return result
+
+def _format_id_value(value):
+    """Convert a single ID value to an integer string, keeping it as-is if not numeric."""
+    try:
+        return str(int(float(value)))
+    except (ValueError, OverflowError):
+        return value
+
+def _split_full_name(df):
+    """
+    Split ClientFullName into FirstName and LastName on the last space.
+    
+    Only rows that have a ClientFullName and are missing either FirstName
+    or LastName are updated. A single-word name is stored as LastName.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with ClientFullName, FirstName and LastName columns
+    """
+    full_name = df['ClientFullName'].str.strip().str.replace(r'\s+', ' ', regex=True)
+    needs_split = (
+        df['ClientFullName'].ne('')
+        & full_name.ne('')
+        & ~(df['FirstName'].ne('') & df['LastName'].ne(''))
+    )
+    if not needs_split.any():
+        return
+    
+    name_parts = full_name[needs_split].str.rsplit(' ', n=1, expand=True).reindex(columns=[0, 1])
+    has_last = name_parts[1].notna()
+    
+    multi_word = name_parts.index[has_last]
+    single_word = name_parts.index[~has_last]
+    df.loc[multi_word, 'FirstName'] = name_parts.loc[multi_word, 0]
+    df.loc[multi_word, 'LastName'] = name_parts.loc[multi_word, 1]
+    df.loc[single_word, 'LastName'] = name_parts.loc[single_word, 0]
 
 def normalize_dataframe(df):
     """
     Normalize column names and apply field mapping.
     
+    All conversions are done column-wise, so the cost is dominated by
+    pandas string operations rather than per-row Python calls.
+    
     Args:
         df (pd.DataFrame): Input DataFrame
         
@@ -28,19 +121,18 @@ def normalize_dataframe(df):
     for col in id_columns:
         if col in df.columns:
             # Convert numeric values to integers first to remove decimal points
-            df[col] = df[col].apply(lambda x: str(int(float(x))) if pd.notnull(x) and str(x).strip() != '' else str(x))
+            df[col] = _format_id_column(df[col])
     
     # Ensure all columns are string type
     for col in df.columns:
         if col not in id_columns:  # Skip ID columns as they're already handled
-            df[col] = df[col].astype(str).replace('nan', '')
+            df[col] = _as_string(df[col]).replace('nan', '')
     
     # Format dates if the columns exist
-    from src.data_models import format_date
     date_columns = ['DateofBirth', 'AdmissionDate']
     for col in date_columns:
         if col in df.columns:
-            df[col] = df[col].apply(lambda x: format_date(str(x)) if x else '')
+            df[col] = format_date_series(df[col])
     
     # Handle ClientFullName field if it exists
     if 'ClientFullName' in df.columns and not df['ClientFullName'].empty:
@@ -51,18 +143,67 @@ def normalize_dataframe(df):
             df['LastName'] = ''
             
         # Split ClientFullName into FirstName and LastName
-        for idx, row in df.iterrows():
-            if row['ClientFullName'] and not (row['FirstName'] and row['LastName']):
-                # Split the name on the last space found
-                name_parts = row['ClientFullName'].strip().split()
-                if len(name_parts) > 1:
-                    df.at[idx, 'FirstName'] = ' '.join(name_parts[:-1])  # Everything before the last part
-                    df.at[idx, 'LastName'] = name_parts[-1]  # Last part
-                elif len(name_parts) == 1:
-                    df.at[idx, 'LastName'] = name_parts[0]  # Only one name component
+        _split_full_name(df)
     
     return df
 
+def normalize_client_table(clients_df):
+    """
+    Bring client data into the form the client table shows and saves.
+    
+    Every column becomes text with blanks for missing values, valid dates
+    are formatted as MM/DD/YYYY and valid ZIP codes as 9 digits. Invalid
+    values are kept as entered so they can be shown and fixed.
+    
+    Args:
+        clients_df (pd.DataFrame): Client data, not modified
+        
+    Returns:
+        pd.DataFrame: Normalized client data
+    """
+    df_display = clients_df.fillna('')
+    for col in df_display.columns:
+        df_display[col] = df_display[col].astype(str).replace('nan', '')
+    
+    if 'DateofBirth' in df_display.columns:
+        dates = df_display['DateofBirth'].str.strip()
+        df_display['DateofBirth'] = format_date_series(dates).where(validate_date_series(dates), dates)
+    if 'ZipCode' in df_display.columns:
+        zips = df_display['ZipCode']
+        formatted_zips = format_zip_series(zips)
+        df_display['ZipCode'] = formatted_zips.where(formatted_zips.ne(''), zips.str.strip())
+    return df_display
+
+def upload_provider(sources, delimiter=','):
+    """
+    Find the provider an upload belongs to without parsing all of it.
+    
+    Only the header and, if the upload has one, the provider column are read.
+    
+    Args:
+        sources (list): Raw file bytes or text of the uploaded files
+        delimiter (str): Field delimiter
+        
+    Returns:
+        str: Distinct provider IDs of the upload, sorted and joined with
+            commas; PROVIDERID for rows without one
+    """
+    providers = set()
+    for source in sources:
+        buffer = io.BytesIO(source) if isinstance(source, bytes) else io.StringIO(source)
+        header = pd.read_csv(buffer, delimiter=delimiter, nrows=0)
+        buffer.seek(0)
+        provider_columns = [col for col in header.columns if FIELD_MAPPING.get(col.strip().lower()) == 'ProviderId']
+        if not provider_columns:
+            providers.add(PROVIDERID)
+            continue
+        values = pd.read_csv(buffer, delimiter=delimiter, usecols=provider_columns[:1], dtype=str).iloc[:, 0]
+        values = values.fillna('').str.strip()
+        providers.update(values[values.ne('')].unique())
+        if values.eq('').any():
+            providers.add(PROVIDERID)
+    return ",".join(sorted(providers)) or PROVIDERID
+
 def handle_missing_fields(df, required_fields=None):
     """
     Add missing fields to DataFrame with empty values.
@@ -83,12 +224,14 @@ def handle_missing_fields(df, required_fields=None):
             
     return df
 
-def extract_admission_data(df):
+def extract_admission_data(df, existing_ids=None):
     """
     Extract admission data from a DataFrame.
     
     Args:
         df (pd.DataFrame): Input DataFrame with potential admission data
+        existing_ids (set, optional): Admission IDs already in use; generated IDs
+            are made unique against them
         
     Returns:
         pd.DataFrame: DataFrame containing only admission-related data
@@ -110,15 +253,24 @@ def extract_admission_data(df):
         # Create admission DataFrame
         admission_df = df[admission_cols].copy()
         
-        # Add provider info
-        from src.config import PROVIDERID, PROVIDERLOCATIONID
-        admission_df['ProviderId'] = PROVIDERID
+        # Add provider info, keeping the provider given in the upload
+        from src.config import PROVIDERLOCATIONID
+        if 'ProviderId' in df.columns:
+            admission_df['ProviderId'] = df['ProviderId'].where(df['ProviderId'].str.strip().ne(''), PROVIDERID)
+        else:
+            admission_df['ProviderId'] = PROVIDERID
         admission_df['ProviderLocationId'] = PROVIDERLOCATIONID
         
         # Generate admission IDs if they don't exist
         if 'ProviderAdmissionId' not in admission_df.columns:
-            from src.data_models import generate_admission_id
-            admission_df['ProviderAdmissionId'] = admission_df['ProviderClientId'].apply(generate_admission_id)
+            from src.data_models import generate_admission_ids
+            admission_df['ProviderAdmissionId'] = generate_admission_ids(
+                df['ProviderClientId'],
+                df.get('FirstName'),
+                df.get('LastName'),
+                df['AdmissionDate'],
+                existing_ids=existing_ids
+            )
         
         # Add default AdmissionType if it doesn't exist
         if 'AdmissionType' not in admission_df.columns:
@@ -126,48 +278,426 @@ def extract_admission_data(df):
     
     return admission_df
 
-def process_csv_data(file_obj):
+def _process_frame(df, existing_admission_ids=None):
     """
-    Process CSV file data.
+    Run the normalization pipeline on a raw DataFrame.
     
     Args:
-        file_obj: File object containing CSV data
+        df (pd.DataFrame): DataFrame as read from the source file
+        existing_admission_ids (set, optional): Admission IDs generated for earlier
+            parts of the same input
         
     Returns:
         tuple: (clients_df, admissions_df) - Processed DataFrames
     """
-    # Read the file and normalize the data
-    df = pd.read_csv(file_obj, delimiter=',')
     df = normalize_dataframe(df)
     
     # Extract admission data before handling missing fields
-    admissions_df = extract_admission_data(df)
+    admissions_df = extract_admission_data(df, existing_admission_ids)
     
     # Process client data
     clients_df = handle_missing_fields(df)
     
     return clients_df, admissions_df
 
-def process_tsv_data(text):
+def _read_with_arrow(source, delimiter, usecols=None):
+    """
+    Parse delimited data with the multithreaded Arrow CSV reader.
+    
+    Every column is read as a pyarrow string and stays pyarrow-backed in the
+    returned DataFrame.
+    
+    Args:
+        source: File object or buffer containing the delimited data
+        delimiter (str): Field delimiter
+        usecols (list, optional): Columns to read, None reads all of them
+        
+    Returns:
+        pd.DataFrame: Parsed data with string[pyarrow] columns
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    start = source.tell()
+    columns = list(pd.read_csv(source, delimiter=delimiter, nrows=0).columns)
+    source.seek(start)
+    
+    # The Arrow reader only accepts binary input
+    if isinstance(source, io.TextIOBase):
+        source = io.BytesIO(source.read().encode("utf-8"))
+    
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in columns},
+            include_columns=usecols,
+            null_values=ARROW_NULL_VALUES,
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def _arrow_available():
+    """Check whether pyarrow can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _read_mapped_columns(source, delimiter):
+    """
+    Read the header row and find the columns that FIELD_MAPPING will keep.
+    
+    The source is rewound to where it started so it can be parsed again.
+    
+    Args:
+        source: File object or buffer containing the delimited data
+        delimiter (str): Field delimiter
+        
+    Returns:
+        list: Original names of the columns whose normalized name is mapped
+    """
+    start = source.tell()
+    header = pd.read_csv(source, delimiter=delimiter, nrows=0)
+    source.seek(start)
+    
+    return [col for col in header.columns if col.strip().lower() in FIELD_MAPPING]
+
+def _process_delimited(source, delimiter, total_size=None, chunksize=None,
+                       progress_callback=None, mapped_columns_only=False, engine="c",
+                       existing_admission_ids=None):
+    """
+    Read and process delimited data, optionally in fixed-size chunks.
+    
+    When chunksize is set, each chunk is normalized on its own and only the
+    processed results are kept, so peak memory is bounded by the chunk size
+    rather than by the size of the input.
+    
+    Args:
+        source: File object or buffer containing the delimited data
+        delimiter (str): Field delimiter
+        total_size (int, optional): Size of the input, used to report progress
+        chunksize (int, optional): Number of rows per chunk, None reads everything at once
+        progress_callback (callable, optional): Called as progress_callback(rows_processed, fraction)
+            after each chunk; fraction is None when the input size is unknown
+        mapped_columns_only (bool): Only parse the columns FIELD_MAPPING knows about
+        engine (str): "c" for the pandas C parser or "pyarrow" for the multithreaded
+            Arrow reader; falls back to "c" when pyarrow is not installed
+        existing_admission_ids (set, optional): Admission IDs generated for earlier
+            parts of the same input
+        
+    Returns:
+        tuple: (clients_df, admissions_df) - Processed DataFrames
+    """
+    # Values are read as strings, as the Arrow reader does: inferring types
+    # would depend on which rows share a chunk (a ZIP column with a blank in
+    # one chunk comes out as floats only there)
+    read_options = {"delimiter": delimiter, "dtype": str}
+    if mapped_columns_only:
+        mapped_columns = _read_mapped_columns(source, delimiter)
+        # Without any recognised column there is nothing to prune against
+        if mapped_columns:
+            read_options["usecols"] = mapped_columns
+    
+    if engine == "pyarrow" and _arrow_available():
+        # The Arrow reader parses the whole input in parallel, so chunking does not apply
+        df = _read_with_arrow(source, delimiter, read_options.get("usecols"))
+        clients_df, admissions_df = _process_frame(df, existing_admission_ids)
+        if progress_callback:
+            progress_callback(len(clients_df), 1.0)
+        return clients_df, admissions_df
+    
+    if not chunksize:
+        clients_df, admissions_df = _process_frame(pd.read_csv(source, **read_options), existing_admission_ids)
+        if progress_callback:
+            progress_callback(len(clients_df), 1.0)
+        return clients_df, admissions_df
+    
+    client_chunks = []
+    admission_chunks = []
+    admission_ids = set(existing_admission_ids or ())
+    rows_processed = 0
+    
+    with pd.read_csv(source, chunksize=chunksize, **read_options) as reader:
+        for chunk in reader:
+            # Generated admission IDs must stay unique across chunks
+            clients_chunk, admissions_chunk = _process_frame(chunk, admission_ids)
+            client_chunks.append(clients_chunk)
+            admission_chunks.append(admissions_chunk)
+            if 'ProviderAdmissionId' in admissions_chunk.columns:
+                admission_ids.update(admissions_chunk['ProviderAdmissionId'])
+            rows_processed += len(clients_chunk)
+            
+            if progress_callback:
+                fraction = None
+                if total_size:
+                    fraction = min(source.tell() / total_size, 1.0)
+                progress_callback(rows_processed, fraction)
+    
+    if not client_chunks:
+        return pd.DataFrame(), pd.DataFrame()
+    
+    clients_df = pd.concat(client_chunks, ignore_index=True)
+    admissions_df = pd.concat(admission_chunks, ignore_index=True)
+    
+    if progress_callback:
+        progress_callback(rows_processed, 1.0)
+    
+    return clients_df, admissions_df
+
+def process_csv_data(file_obj, chunksize=None, progress_callback=None, mapped_columns_only=False, engine="c"):
+    """
+    Process CSV file data.
+    
+    Args:
+        file_obj: File object containing CSV data
+        chunksize (int, optional): Number of rows to read and process at a time
+        progress_callback (callable, optional): Called as progress_callback(rows_processed, fraction)
+        mapped_columns_only (bool): Skip columns that are not in FIELD_MAPPING
+        engine (str): Parser backend, "c" or "pyarrow"
+        
+    Returns:
+        tuple: (clients_df, admissions_df) - Processed DataFrames
+    """
+    total_size = getattr(file_obj, 'size', None)
+    return _process_delimited(
+        file_obj, ',', total_size, chunksize, progress_callback, mapped_columns_only, engine
+    )
+
+def process_tsv_data(text, chunksize=None, progress_callback=None, mapped_columns_only=False, engine="c"):
     """
     Process TSV text data.
     
     Args:
         text (str): TSV text
+        chunksize (int, optional): Number of rows to read and process at a time
+        progress_callback (callable, optional): Called as progress_callback(rows_processed, fraction)
+        mapped_columns_only (bool): Skip columns that are not in FIELD_MAPPING
+        engine (str): Parser backend, "c" or "pyarrow"
+        
+    Returns:
+        tuple: (clients_df, admissions_df) - Processed DataFrames
+    """
+    return _process_delimited(
+        io.StringIO(text), '\t', len(text), chunksize, progress_callback, mapped_columns_only, engine
+    )
+
+def _process_tsv_lines(header, lines, mapped_columns_only=False, existing_admission_ids=None,
+                       chunksize=None, progress_callback=None):
+    """
+    Parse and process TSV lines that follow a known header.
+    
+    Args:
+        header (str): Header line, including its trailing newline
+        lines (str): Data lines to parse
+        mapped_columns_only (bool): Skip columns that are not in FIELD_MAPPING
+        existing_admission_ids (set, optional): Admission IDs generated for earlier lines
+        chunksize (int, optional): Number of rows to read and process at a time
+        progress_callback (callable, optional): Called as progress_callback(rows_processed, fraction)
         
     Returns:
         tuple: (clients_df, admissions_df) - Processed DataFrames
     """
-    from io import StringIO
+    text = header + lines
+    return _process_delimited(
+        io.StringIO(text), '\t', len(text), chunksize, progress_callback, mapped_columns_only,
+        existing_admission_ids=existing_admission_ids
+    )
+
+def _admission_ids(admissions_df):
+    """Return the set of admission IDs in an admissions DataFrame."""
+    if 'ProviderAdmissionId' not in admissions_df.columns:
+        return set()
+    return set(admissions_df['ProviderAdmissionId'])
+
+def _text_hash(text):
+    """Return a SHA-256 hex digest of a string."""
+    import hashlib
     
-    # Read the data and normalize
-    df = pd.read_csv(StringIO(text), delimiter='\t')
-    df = normalize_dataframe(df)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def process_tsv_data_incremental(text, state=None, mapped_columns_only=False, chunksize=None,
+                                 progress_callback=None):
+    """
+    Process TSV text, reusing earlier results when rows were only appended.
     
-    # Extract admission data before handling missing fields
-    admissions_df = extract_admission_data(df)
+    The state returned by the previous call records how much of the text has
+    been parsed (up to the last complete line) and a hash of that prefix. If
+    the new text still starts with the same prefix, only the lines after it
+    are parsed and normalized, and the results are merged into the existing
+    frames. Any other change falls back to a full parse.
     
-    # Process client data
-    clients_df = handle_missing_fields(df)
+    The returned state's "reused_rows" holds the number of leading client
+    and admission rows taken over unchanged from the previous call, (0, 0)
+    after a full parse; callers can use it to pass on only the new rows.
+    
+    Args:
+        text (str): TSV text
+        state (dict, optional): State returned by the previous call
+        mapped_columns_only (bool): Skip columns that are not in FIELD_MAPPING
+        chunksize (int, optional): Number of rows to read and process at a time
+        progress_callback (callable, optional): Called as progress_callback(rows_processed, fraction)
+        
+    Returns:
+        tuple: (clients_df, admissions_df, state) - Processed DataFrames and the
+            state to pass to the next call
+    """
+    header_end = text.find('\n') + 1
+    # Quoted fields may span lines, so line-based appends are only safe without quotes
+    if header_end == 0 or '"' in text:
+        clients_df, admissions_df = process_tsv_data(
+            text, chunksize, progress_callback, mapped_columns_only=mapped_columns_only
+        )
+        return clients_df, admissions_df, None
+    
+    header = text[:header_end]
+    complete_end = max(text.rfind('\n') + 1, header_end)
+    
+    can_append = (
+        state is not None
+        and state["header"] == header
+        and state["mapped_columns_only"] == mapped_columns_only
+        and complete_end >= state["complete_end"]
+        and _text_hash(text[:state["complete_end"]]) == state["prefix_hash"]
+    )
+    
+    if can_append:
+        clients_df, admissions_df = state["clients_df"], state["admissions_df"]
+        reused_rows = (len(clients_df), len(admissions_df))
+        new_lines = text[state["complete_end"]:complete_end]
+        if new_lines.strip():
+            new_clients, new_admissions = _process_tsv_lines(
+                header, new_lines, mapped_columns_only, _admission_ids(admissions_df),
+                chunksize, progress_callback
+            )
+            clients_df = pd.concat([clients_df, new_clients], ignore_index=True)
+            admissions_df = pd.concat([admissions_df, new_admissions], ignore_index=True)
+    else:
+        reused_rows = (0, 0)
+        clients_df, admissions_df = _process_tsv_lines(
+            header, text[header_end:complete_end], mapped_columns_only,
+            chunksize=chunksize, progress_callback=progress_callback
+        )
+    
+    state = {
+        "header": header,
+        "mapped_columns_only": mapped_columns_only,
+        "complete_end": complete_end,
+        "prefix_hash": _text_hash(text[:complete_end]),
+        "reused_rows": reused_rows,
+        "clients_df": clients_df,
+        "admissions_df": admissions_df
+    }
+    
+    # A trailing line without a newline may still be in progress, so it is
+    # processed on its own and not kept in the state
+    partial_line = text[complete_end:]
+    if partial_line.strip():
+        tail_clients, tail_admissions = _process_tsv_lines(
+            header, partial_line, mapped_columns_only, _admission_ids(admissions_df)
+        )
+        clients_df = pd.concat([clients_df, tail_clients], ignore_index=True)
+        admissions_df = pd.concat([admissions_df, tail_admissions], ignore_index=True)
+    
+    return clients_df, admissions_df, state
+
+def _process_csv_source(source, chunksize=None, mapped_columns_only=False, engine="c", progress_callback=None):
+    """
+    Process one CSV input in a worker process.
+    
+    Args:
+        source (bytes or str): Raw file contents, or a path to the file
+        chunksize (int, optional): Number of rows to read and process at a time
+        mapped_columns_only (bool): Skip columns that are not in FIELD_MAPPING
+        engine (str): Parser backend, "c" or "pyarrow"
+        progress_callback (callable, optional): Called as progress_callback(rows_processed, fraction);
+            only usable when processing in the calling process
+        
+    Returns:
+        tuple: (clients_df, admissions_df) - Processed DataFrames
+    """
+    if isinstance(source, bytes):
+        return _process_delimited(
+            io.BytesIO(source), ',', len(source), chunksize, progress_callback, mapped_columns_only, engine
+        )
+    
+    with open(source, 'rb') as file_obj:
+        return _process_delimited(
+            file_obj, ',', os.path.getsize(source), chunksize, progress_callback, mapped_columns_only, engine
+        )
+
+def combine_processed_data(results):
+    """
+    Merge processed (clients_df, admissions_df) pairs from several files.
+    
+    Clients are keyed on ProviderClientId and admissions on
+    (ProviderClientId, AdmissionDate); when a key appears in more than one
+    file, the row from the later file wins. Clients without an ID are kept.
+    
+    Args:
+        results (list): (clients_df, admissions_df) tuples in file order
+        
+    Returns:
+        tuple: (clients_df, admissions_df) - Combined DataFrames
+    """
+    clients_df = pd.concat([clients for clients, _ in results], ignore_index=True).fillna('')
+    admissions_df = pd.concat([admissions for _, admissions in results], ignore_index=True).fillna('')
+    
+    if 'ProviderClientId' in clients_df.columns:
+        duplicated = clients_df.duplicated(subset='ProviderClientId', keep='last')
+        clients_df = clients_df[~duplicated | clients_df['ProviderClientId'].eq('')]
+        clients_df = clients_df.reset_index(drop=True)
+    
+    admission_key = ['ProviderClientId', 'AdmissionDate']
+    if all(col in admissions_df.columns for col in admission_key):
+        admissions_df = admissions_df.drop_duplicates(subset=admission_key, keep='last').reset_index(drop=True)
+    
+    # Admission IDs generated in different files may collide
+    if 'ProviderAdmissionId' in admissions_df.columns:
+        from src.data_models import resolve_admission_id_collisions
+        admissions_df['ProviderAdmissionId'] = resolve_admission_id_collisions(admissions_df['ProviderAdmissionId'])
     
     return clients_df, admissions_df
+
+def process_csv_files(sources, max_workers=None, progress_callback=None, chunksize=None,
+                      mapped_columns_only=False, engine="c"):
+    """
+    Process several CSV files in parallel and merge them into one dataset.
+    
+    Each file is parsed and normalized in its own worker process, so a batch
+    of rosters takes about as long as the largest file when enough cores are
+    available.
+    
+    Args:
+        sources (list): Raw file contents (bytes) or file paths
+        max_workers (int, optional): Number of worker processes, defaults to the CPU count
+        progress_callback (callable, optional): Called as progress_callback(files_processed, fraction),
+            or as progress_callback(rows_processed, fraction) when there is only one file
+        chunksize (int, optional): Number of rows each worker reads at a time
+        mapped_columns_only (bool): Skip columns that are not in FIELD_MAPPING
+        engine (str): Parser backend, "c" or "pyarrow"
+        
+    Returns:
+        tuple: (clients_df, admissions_df) - Combined DataFrames
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    options = {"chunksize": chunksize, "mapped_columns_only": mapped_columns_only, "engine": engine}
+    
+    # A single file is not worth the cost of starting a worker process, and
+    # being processed here it can report progress after every chunk
+    if len(sources) == 1:
+        results = [_process_csv_source(sources[0], progress_callback=progress_callback, **options)]
+        return combine_processed_data(results)
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_process_csv_source, source, **options) for source in sources]
+        for files_processed, _ in enumerate(as_completed(futures), start=1):
+            if progress_callback:
+                progress_callback(files_processed, files_processed / len(futures))
+        results = [future.result() for future in futures]
+    
+    return combine_processed_data(results)
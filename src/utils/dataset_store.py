@@ -0,0 +1,846 @@
+"""
+Dataset access for the client, admission, survey and discharge data.
+
+Datasets are kept in the SQLite record store when RECORD_STORE_PATH is set,
+and in session state otherwise. In session state, records added through the
+forms are collected column-wise and only combined with the stored DataFrame
+when a page reads the dataset, so adding a record does not copy the
+existing data.
+
+Frames in session state may be shared with other sessions (a roster loaded
+from the shared ingestion cache is stored as is), so they are never modified
+in place: every change goes through set_dataset, update_cells or
+append_records and produces a new frame for this session only. For
+Arrow-backed text columns the new frame reuses the shared buffers, and holds
+only the appended rows and changed cells of the session on top of them.
+
+When the session's datasets use more than SESSION_MEMORY_BUDGET_MB, the
+least recently used ones that the current run did not read are written to
+Parquet files and dropped from memory; the next access reads them back.
+"""
+import os
+import tempfile
+import uuid
+import weakref
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import streamlit as st
+from src.config import RECORD_STORE_PATH, SESSION_MEMORY_BUDGET_MB, SPILL_DIRECTORY, UNDO_MEMORY_BUDGET_MB
+from src.utils.record_store import RecordStore
+from src.utils.undo_journal import apply_delta, delta_size, make_delta, make_row_delta
+
+# Session datasets covered by memory accounting and spilling
+DATASETS = ["clients_df", "admissions_df", "survey_df", "discharges_df"]
+
+# Chunks an Arrow-backed column may be split into by cell edits before an
+# edit copies it into one piece again
+MAX_COLUMN_CHUNKS = 64
+
+@st.cache_resource
+def _open_record_store(path):
+    """Open the record store once per process; it is shared by all sessions."""
+    return RecordStore(path)
+
+def _record_store():
+    """Return the configured record store, or None when data is kept in session state."""
+    if RECORD_STORE_PATH is None:
+        return None
+    return _open_record_store(RECORD_STORE_PATH)
+
+def _buffer_key(name):
+    """Session state key holding the pending records of a dataset."""
+    return f"{name}_pending"
+
+def _index_key(name, column):
+    """Session state key holding a value-to-rows index of a dataset column."""
+    return f"{name}_index_{column}"
+
+def _store_frame_key(name):
+    """Session state key holding the last full read of a record store dataset."""
+    return f"{name}_store_frame"
+
+def _spill_key(name):
+    """Session state key holding the spill file details of a dataset."""
+    return f"{name}_spilled"
+
+def _touch(name):
+    """Mark a session dataset as the most recently used, and as used by the current run."""
+    access = st.session_state.setdefault("dataset_access", {})
+    access[name] = max(access.values(), default=0) + 1
+    st.session_state.setdefault("datasets_used_this_run", set()).add(name)
+
+def _remove_files(paths):
+    """Delete files that still exist; used to clean up spill files."""
+    for path in list(paths):
+        if os.path.exists(path):
+            os.remove(path)
+        paths.discard(path)
+
+class _SpillFiles:
+    """
+    Paths of a session's spill files, deleted when the session ends.
+
+    Streamlit drops a session's state some time after its browser tab
+    closes; the finalizer then removes any files still on disk. It also
+    runs when the server process exits.
+    """
+    def __init__(self):
+        self.paths = set()
+        weakref.finalize(self, _remove_files, self.paths)
+
+def _spill_files():
+    """Return the spill file registry of the session."""
+    return st.session_state.setdefault("spill_files", _SpillFiles()).paths
+
+def _spill_directory():
+    """Create the spill directory, readable by the server's user only, and return it."""
+    directory = SPILL_DIRECTORY or os.path.join(tempfile.gettempdir(), "client_data_spill")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+def _stored_frame(name):
+    """Return the stored frame of a session dataset, reading it back if it was spilled."""
+    spilled = st.session_state.pop(_spill_key(name), None)
+    if spilled is not None:
+        if spilled["format"] == "parquet":
+            st.session_state[name] = pd.read_parquet(spilled["path"])
+        else:
+            st.session_state[name] = pd.read_pickle(spilled["path"])
+        _remove_files({spilled["path"]})
+        _spill_files().discard(spilled["path"])
+    return st.session_state.get(name)
+
+def _discard_spill(name):
+    """Delete the spill file of a dataset that is being replaced."""
+    spilled = st.session_state.pop(_spill_key(name), None)
+    if spilled is not None:
+        _remove_files({spilled["path"]})
+        _spill_files().discard(spilled["path"])
+
+def _bump_version(name):
+    """Record that a session dataset changed."""
+    versions = st.session_state.setdefault("dataset_versions", {})
+    versions[name] = versions.get(name, 0) + 1
+
+def _drop_indexes(name, columns=None):
+    """Forget the column indexes of a dataset, all of them unless columns are given."""
+    if columns is not None:
+        for col in columns:
+            st.session_state.pop(_index_key(name, col), None)
+        return
+    prefix = _index_key(name, "")
+    for key in [key for key in st.session_state if str(key).startswith(prefix)]:
+        del st.session_state[key]
+
+def append_records(name, records):
+    """
+    Add records to a dataset.
+
+    With the record store the records are written at once; in session state
+    they are queued until the dataset is next read.
+
+    Args:
+        name (str): Session state key of the dataset (e.g. "admissions_df")
+        records (list): Record dicts mapping column name to value
+    """
+    store = _record_store()
+    if store is not None:
+        store.append(name, records)
+        return
+
+    _journal_change(name, ("truncate", len(records), _current_columns(name), records))
+    _queue_records(name, records)
+    _touch(name)
+
+def _queue_records(name, records):
+    """Add records to the append buffer of a session dataset."""
+    _bump_version(name)
+    key = _buffer_key(name)
+    buffer = st.session_state.get(key)
+    if buffer is None:
+        buffer = {"columns": {}, "rows": 0}
+        st.session_state[key] = buffer
+
+    # Keep existing column indexes current; new rows go after all existing ones
+    indexes = [
+        st.session_state[index_key] for index_key in st.session_state
+        if str(index_key).startswith(_index_key(name, ""))
+    ]
+    for index in indexes:
+        if index["rows"] == dataset_length(name):
+            for offset, record in enumerate(records):
+                index["positions"].setdefault(record.get(index["column"]), []).append(index["rows"] + offset)
+            index["rows"] += len(records)
+
+    columns = buffer["columns"]
+    for record in records:
+        for col in record:
+            if col not in columns:
+                # Backfill a column first seen in this record
+                columns[col] = [None] * buffer["rows"]
+        for col, values in columns.items():
+            values.append(record.get(col))
+        buffer["rows"] += 1
+
+def get_dataset(name, columns=None):
+    """
+    Return a dataset including any queued records.
+
+    With the record store a full read is kept for the session until the
+    dataset's version changes, so pages that read the dataset several
+    times per run query the table once. Narrow reads query only the given
+    columns unless the full read is current.
+
+    Args:
+        name (str): Session state key of the dataset
+        columns (list, optional): Columns to return, all when None; missing
+            ones are returned empty
+
+    Returns:
+        pd.DataFrame: The dataset, empty if it has not been created; treat it as read-only
+    """
+    store = _record_store()
+    if store is not None:
+        version = store.version(name)
+        cached = st.session_state.get(_store_frame_key(name))
+        if cached is not None and cached[0] == version:
+            df = cached[1]
+        elif columns is not None:
+            return store.load(name, columns)
+        else:
+            df = store.load(name)
+            st.session_state[_store_frame_key(name)] = (version, df)
+        return df if columns is None else df.reindex(columns=columns)
+
+    _touch(name)
+    df = _materialize(name)
+    return df if columns is None else df.reindex(columns=columns)
+
+def read_page(name, offset, limit, columns=None):
+    """
+    Read a range of rows of a dataset.
+
+    With the record store only the requested rows and columns are queried.
+
+    Args:
+        name (str): Session state key of the dataset
+        offset (int): Position of the first row
+        limit (int): Maximum number of rows
+        columns (list, optional): Columns to return, all when None
+
+    Returns:
+        pd.DataFrame: The rows, with a RangeIndex from 0
+    """
+    store = _record_store()
+    if store is not None:
+        return store.read_page(name, offset, limit, columns)
+    return get_dataset(name, columns).iloc[offset:offset + limit].reset_index(drop=True)
+
+def _materialize(name):
+    """Combine a session dataset with its queued records, without marking it as used."""
+    df = _stored_frame(name)
+    if df is None:
+        df = pd.DataFrame()
+
+    buffer = st.session_state.pop(_buffer_key(name), None)
+    if buffer and buffer["rows"]:
+        pending = pd.DataFrame(buffer["columns"])
+        if df.empty and len(df.columns) == 0:
+            df = pending
+        else:
+            df = pd.concat([df, pending], ignore_index=True)
+
+    st.session_state[name] = df
+    return df
+
+def set_dataset(name, df):
+    """
+    Replace a dataset, discarding any queued records.
+
+    Args:
+        name (str): Session state key of the dataset
+        df (pd.DataFrame): New contents
+    """
+    store = _record_store()
+    if store is not None:
+        store.replace(name, df)
+        return
+
+    _journal_change(name, ("delta", make_delta(get_dataset(name), df)))
+    _replace(name, df)
+
+def update_cells(name, updates):
+    """
+    Change individual cells of a dataset.
+
+    Only the touched columns are copied and only the changed rows are
+    journaled, so the cost does not grow with the number of rows beyond
+    copying those columns.
+
+    Args:
+        name (str): Session state key of the dataset
+        updates (dict): Row position -> {column: new value}, columns must exist
+    """
+    if not updates:
+        return
+
+    store = _record_store()
+    if store is not None:
+        store.update(name, updates)
+        return
+
+    current = get_dataset(name)
+    _journal_change(name, ("delta", make_row_delta(current, list(updates))))
+
+    updated = current.copy(deep=False)
+    columns = dict.fromkeys(col for values in updates.values() for col in values)
+    for col in columns:
+        positions = sorted(position for position, values in updates.items() if col in values)
+        updated[col] = _patch_column(current[col], positions, [updates[position][col] for position in positions])
+    # Indexes of untouched columns still hold; the row count did not change
+    _replace(name, updated, changed_columns=list(columns))
+
+def _patch_column(series, positions, values):
+    """
+    Return a column with some cells changed, leaving the original as it is.
+
+    Arrow-backed columns are rebuilt from slices of the original around the
+    changed cells. The slices share the original's buffers, so editing a few
+    cells of a shared frame does not copy the column. An edit that would
+    split the column into more than MAX_COLUMN_CHUNKS pieces copies it into
+    one instead. Other columns are copied.
+
+    Args:
+        series (pd.Series): Column to change
+        positions (list): Sorted row positions of the changed cells
+        values (list): New values, in the order of positions
+
+    Returns:
+        pd.Series: Changed column with the same index
+    """
+    if isinstance(series.array, pd.arrays.ArrowExtensionArray) and all(isinstance(value, str) for value in values):
+        if series.array.__arrow_array__().num_chunks + 2 * len(positions) <= MAX_COLUMN_CHUNKS:
+            pieces = []
+            start = 0
+            for position, value in zip(positions, values):
+                pieces.append(series.iloc[start:position])
+                pieces.append(pd.Series([value], dtype=series.dtype))
+                start = position + 1
+            pieces.append(series.iloc[start:])
+            patched = pd.concat(pieces, ignore_index=True)
+            patched.index = series.index
+            patched.name = series.name
+            return patched
+        # Copy into a single piece, which later edits can slice again
+        cells = series.to_numpy(dtype=object, copy=True)
+        cells[positions] = values
+        return pd.Series(cells, index=series.index, name=series.name, dtype=series.dtype)
+
+    patched = series.copy()
+    if not (pd.api.types.is_string_dtype(patched) or pd.api.types.is_object_dtype(patched)):
+        patched = patched.astype(object)
+    patched.iloc[positions] = values
+    return patched
+
+def store_normalized(name, df):
+    """
+    Replace a dataset with a normalized form of the same records.
+
+    For changes to how values are written (text conversion, date and ZIP
+    formats), not to what they are. Nothing is journaled and, in session
+    state, the dataset version does not move, so undo steps and derived
+    values stay valid. With the record store only the differing cells are
+    written.
+
+    Args:
+        name (str): Session state key of the dataset
+        df (pd.DataFrame): Normalized contents with the same rows in the same order
+    """
+    store = _record_store()
+    current = get_dataset(name)
+    if len(df) != len(current):
+        raise ValueError(f"Normalized {name} has {len(df)} rows, expected {len(current)}")
+
+    changed_columns = [
+        col for col in df.columns
+        if col not in current.columns or not df[col].astype(object).equals(current[col].astype(object))
+    ]
+    if store is not None:
+        updates = {}
+        for col in changed_columns:
+            new_values = df[col].to_numpy(dtype=object)
+            old_values = current[col].to_numpy(dtype=object) if col in current.columns else [None] * len(df)
+            for position in np.flatnonzero(new_values != old_values):
+                updates.setdefault(int(position), {})[col] = new_values[position]
+        store.update(name, updates)
+        return
+
+    _drop_indexes(name, changed_columns)
+    st.session_state[name] = df
+
+def _replace(name, df, changed_columns=None):
+    """Store a new frame for a session dataset."""
+    _discard_spill(name)
+    st.session_state.pop(_buffer_key(name), None)
+    _drop_indexes(name, changed_columns)
+    _bump_version(name)
+    st.session_state[name] = df
+
+def _current_columns(name):
+    """Columns of a session dataset, including those only queued records have."""
+    spilled = st.session_state.get(_spill_key(name))
+    df = st.session_state.get(name)
+    if spilled is not None:
+        columns = list(spilled["columns"])
+    else:
+        columns = [] if df is None else list(df.columns)
+    buffer = st.session_state.get(_buffer_key(name))
+    if buffer:
+        columns.extend(col for col in buffer["columns"] if col not in columns)
+    return columns
+
+def _journal():
+    """Return the session's undo journal, creating it on first use."""
+    return st.session_state.setdefault("undo_journal", {"undo": [], "redo": [], "open": None})
+
+def _change_size(change):
+    """Estimate the memory held by a journal change."""
+    if change[0] == "delta":
+        return delta_size(change[1])
+    return int(pd.DataFrame(change[-1]).memory_usage(deep=True).sum())
+
+def _push_action(stack, action):
+    """Add an action to the undo or redo stack and trim the journal to its memory budget."""
+    journal = _journal()
+    action["size"] = sum(_change_size(change) for _, change in action["changes"])
+    journal[stack].append(action)
+
+    # Drop the oldest steps first; redo steps go after all undo steps
+    budget = UNDO_MEMORY_BUDGET_MB * 1024 * 1024
+    total = sum(entry["size"] for entry in journal["undo"] + journal["redo"])
+    for trim_stack in ("undo", "redo"):
+        while total > budget and journal[trim_stack]:
+            total -= journal[trim_stack].pop(0)["size"]
+
+def _journal_change(name, change):
+    """
+    Record how to revert a change that is about to be made to a session dataset.
+
+    Args:
+        name (str): Session state key of the dataset
+        change (tuple): Operation that restores the previous version, one of
+            ("truncate", row_count, columns, records) or ("delta", delta)
+    """
+    journal = _journal()
+    journal["redo"].clear()
+    if journal["open"] is not None:
+        journal["open"]["changes"].append((name, change))
+    else:
+        _push_action("undo", {"label": f"change to {name}", "changes": [(name, change)]})
+
+def journal_state(key, undo_value):
+    """
+    Record a session state value that belongs to the open journal action.
+
+    Undoing the action sets the key to undo_value, and redoing it restores
+    the value it had before the undo. Outside journal_action the value
+    replaces the one the latest undo step recorded for the key, if it
+    recorded one, for changes that follow that step without needing their own.
+
+    Args:
+        key (str): Session state key
+        undo_value: Value the key gets when the action is undone
+    """
+    journal = _journal()
+    if journal["open"] is not None:
+        journal["open"].setdefault("state", {})[key] = undo_value
+    elif journal["undo"] and key in journal["undo"][-1].get("state", {}):
+        journal["undo"][-1]["state"][key] = undo_value
+
+@contextmanager
+def journal_action(label):
+    """
+    Group the dataset changes made inside the block into one undo step.
+
+    Args:
+        label (str): Description shown on the undo and redo buttons
+    """
+    journal = _journal()
+    if journal["open"] is not None:
+        # Nested actions belong to the outer one
+        yield
+        return
+
+    journal["open"] = {"label": label, "changes": []}
+    try:
+        yield
+    finally:
+        action = journal["open"]
+        journal["open"] = None
+        if action["changes"]:
+            _push_action("undo", action)
+
+def _apply_change(name, change):
+    """
+    Apply a journal change to a session dataset.
+
+    Args:
+        name (str): Session state key of the dataset
+        change (tuple): Journal change
+
+    Returns:
+        tuple: Change that reverts this one
+    """
+    if change[0] == "append":
+        _, records, columns = change
+        _queue_records(name, records)
+        return ("truncate", len(records), columns, records)
+
+    current = get_dataset(name)
+    if change[0] == "truncate":
+        _, row_count, columns, records = change
+        restored = current.iloc[:len(current) - row_count]
+        if list(restored.columns) != columns:
+            restored = restored.reindex(columns=columns)
+        _replace(name, restored)
+        # Redoing and undoing again must restore the same columns
+        return ("append", records, columns)
+
+    restored = apply_delta(current, change[1])
+    _replace(name, restored)
+    return ("delta", make_delta(current, restored))
+
+def _replay(source, target):
+    """Move the latest action from one journal stack to the other, applying it."""
+    journal = _journal()
+    if _record_store() is not None or not journal[source]:
+        return None
+
+    action = journal[source].pop()
+    inverse = [(name, _apply_change(name, change)) for name, change in reversed(action["changes"])]
+    state = {key: st.session_state.get(key) for key in action.get("state", {})}
+    st.session_state.update(action.get("state", {}))
+    _push_action(target, {"label": action["label"], "changes": inverse[::-1], "state": state})
+    return action["label"]
+
+def undo():
+    """
+    Revert the most recent dataset change (or group of changes).
+
+    Returns:
+        str or None: Label of the reverted action, None if there was nothing to undo
+    """
+    return _replay("undo", "redo")
+
+def redo():
+    """
+    Reapply the most recently undone action.
+
+    Returns:
+        str or None: Label of the reapplied action, None if there was nothing to redo
+    """
+    return _replay("redo", "undo")
+
+def journal_labels():
+    """
+    Describe the actions undo and redo would apply.
+
+    The journal is kept in session state only; with the shared record store
+    there is no undo.
+
+    Returns:
+        tuple: (undo_label, redo_label), None where nothing is available
+    """
+    if _record_store() is not None:
+        return None, None
+    journal = _journal()
+    return (
+        journal["undo"][-1]["label"] if journal["undo"] else None,
+        journal["redo"][-1]["label"] if journal["redo"] else None
+    )
+
+def dataset_version(name):
+    """
+    Return a counter that changes whenever a dataset is modified.
+
+    Derived data (search indexes, dropdown options, ...) can be cached
+    against it and rebuilt only when the counter moves.
+
+    Args:
+        name (str): Session state key of the dataset
+
+    Returns:
+        int: Current version
+    """
+    store = _record_store()
+    if store is not None:
+        return store.version(name)
+    return st.session_state.get("dataset_versions", {}).get(name, 0)
+
+def memoize(key, datasets, compute):
+    """
+    Return a value derived from datasets, recomputed only after they change.
+
+    Entries are kept per session and keyed on the versions of the datasets
+    they read, so a cached value is never served after one of them was
+    modified.
+
+    Args:
+        key (hashable): Name of the derived value; include any parameters of
+            the computation (e.g. ("admission_options", open_only))
+        datasets (list): Session state keys of the datasets compute reads
+        compute (callable): Called without arguments to build the value
+
+    Returns:
+        The cached or newly computed value; treat it as read-only
+    """
+    versions = tuple(dataset_version(name) for name in datasets)
+    cache = st.session_state.setdefault("derived_cache", {})
+    entry = cache.get(key)
+    if entry is None or entry[0] != versions:
+        entry = (versions, compute())
+        cache[key] = entry
+    return entry[1]
+
+def prime_memo(key, datasets, value):
+    """
+    Store a derived value for the current versions of its datasets.
+
+    Lets a caller that changed a dataset and already knows the matching
+    derived value (e.g. by patching the old one) skip the next recompute.
+
+    Args:
+        key (hashable): Name of the derived value, as passed to memoize
+        datasets (list): Session state keys of the datasets it is derived from
+        value: Value memoize should return until the datasets change again
+    """
+    versions = tuple(dataset_version(name) for name in datasets)
+    st.session_state.setdefault("derived_cache", {})[key] = (versions, value)
+
+def dataset_length(name):
+    """
+    Count the records of a dataset without loading it.
+
+    Args:
+        name (str): Session state key of the dataset
+
+    Returns:
+        int: Number of stored plus queued records
+    """
+    store = _record_store()
+    if store is not None:
+        return store.count(name)
+
+    spilled = st.session_state.get(_spill_key(name))
+    df = st.session_state.get(name)
+    if spilled is not None:
+        stored_rows = spilled["rows"]
+    else:
+        stored_rows = 0 if df is None else len(df)
+    buffer = st.session_state.get(_buffer_key(name))
+    return stored_rows + (buffer["rows"] if buffer else 0)
+
+def column_values(name, column):
+    """
+    List the values of one column, including queued records.
+
+    Args:
+        name (str): Session state key of the dataset
+        column (str): Column name
+
+    Returns:
+        list: Column values, stored records first
+    """
+    store = _record_store()
+    if store is not None:
+        return store.column_values(name, column)
+
+    _touch(name)
+    values = []
+    df = _stored_frame(name)
+    if df is not None:
+        # Rows without the column count as None so positions line up with the rows
+        values.extend(df[column].tolist() if column in df.columns else [None] * len(df))
+    buffer = st.session_state.get(_buffer_key(name))
+    if buffer:
+        values.extend(buffer["columns"].get(column, [None] * buffer["rows"]))
+    return values
+
+def find_records(name, column, value):
+    """
+    Read the records whose column equals a value.
+
+    With the record store this is an indexed lookup that does not load the
+    rest of the dataset.
+
+    Args:
+        name (str): Session state key of the dataset
+        column (str): Column to match (e.g. "ProviderClientId")
+        value: Value to match
+
+    Returns:
+        pd.DataFrame: Matching records
+    """
+    store = _record_store()
+    if store is not None:
+        return store.find(name, column, value)
+
+    positions = record_index(name, column).get(value, [])
+    return get_dataset(name).iloc[positions]
+
+def record_index(name, column):
+    """
+    Map each value of a column to the positions of the rows holding it.
+
+    In session state the index is built once and then extended as records
+    are appended, so lookups cost one dict access. Replacing the dataset
+    discards it. With the record store, which other sessions also write to,
+    it is rebuilt from the column whenever the dataset's version changes.
+
+    Args:
+        name (str): Session state key of the dataset
+        column (str): Column to index (e.g. "ProviderClientId")
+
+    Returns:
+        dict: Column value -> list of row positions in get_dataset(name), in order
+    """
+    store = _record_store()
+    key = _index_key(name, column)
+    index = st.session_state.get(key)
+
+    # Rebuild if missing, if the dataset was assigned directly or if the store changed
+    if store is not None:
+        current = index is not None and index.get("version") == store.version(name)
+    else:
+        current = index is not None and index["rows"] == dataset_length(name)
+    if not current:
+        positions = {}
+        values = column_values(name, column)
+        for position, value in enumerate(values):
+            positions.setdefault(value, []).append(position)
+        index = {"column": column, "rows": len(values), "positions": positions}
+        if store is not None:
+            index["version"] = store.version(name)
+        st.session_state[key] = index
+
+    return index["positions"]
+
+def dataset_memory(name):
+    """
+    Measure the memory a session dataset holds.
+
+    The deep size of the stored frame is computed once per frame and
+    remembered; queued records are measured on each call.
+
+    Args:
+        name (str): Session state key of the dataset
+
+    Returns:
+        int: Size in bytes, 0 while the dataset is spilled to disk
+    """
+    if _record_store() is not None or _spill_key(name) in st.session_state:
+        return 0
+
+    size = 0
+    df = st.session_state.get(name)
+    if df is not None:
+        sizes = st.session_state.setdefault("dataset_memory", {})
+        frame_key = (id(df), len(df))
+        cached = sizes.get(name)
+        if cached is None or cached[0] != frame_key:
+            cached = (frame_key, int(df.memory_usage(deep=True).sum()))
+            sizes[name] = cached
+        size += cached[1]
+
+    buffer = st.session_state.get(_buffer_key(name))
+    if buffer and buffer["rows"]:
+        size += int(pd.DataFrame(buffer["columns"]).memory_usage(deep=True).sum())
+    return size
+
+def is_spilled(name):
+    """
+    Check whether a session dataset is currently written out to disk.
+
+    Args:
+        name (str): Session state key of the dataset
+
+    Returns:
+        bool: True while the dataset is spilled
+    """
+    return _spill_key(name) in st.session_state
+
+def spill_dataset(name):
+    """
+    Write a session dataset to disk and drop it from memory.
+
+    Parquet is used when pyarrow is installed and the columns allow it, and
+    pickle otherwise. The dataset is read back on its next access.
+
+    Args:
+        name (str): Session state key of the dataset
+
+    Returns:
+        bool: True if the dataset was spilled
+    """
+    if _record_store() is not None or is_spilled(name) or not dataset_length(name):
+        return False
+
+    # Fold queued records in without counting this as a use of the dataset
+    df = _materialize(name)
+
+    session_id = st.session_state.setdefault("spill_session_id", uuid.uuid4().hex)
+    directory = _spill_directory()
+    path = os.path.join(directory, f"{session_id}_{name}.parquet")
+    try:
+        df.to_parquet(path, index=False)
+        spill_format = "parquet"
+    except (ImportError, TypeError, ValueError):
+        # pyarrow missing, or mixed-type object columns Parquet cannot store
+        _remove_files({path})
+        path = os.path.join(directory, f"{session_id}_{name}.pkl")
+        df.to_pickle(path)
+        spill_format = "pickle"
+    # The files hold client data; keep them private to the server's user
+    os.chmod(path, 0o600)
+    _spill_files().add(path)
+
+    st.session_state[_spill_key(name)] = {
+        "path": path,
+        "format": spill_format,
+        "rows": len(df),
+        "columns": list(df.columns)
+    }
+    st.session_state[name] = None
+    st.session_state.get("dataset_memory", {}).pop(name, None)
+    return True
+
+def enforce_memory_budget():
+    """
+    Spill the least recently used session datasets until the session fits its budget.
+
+    Call once at the end of each script run. Datasets the run read are never
+    spilled, so a dataset that is over the budget on its own but used on
+    every run stays in memory instead of being written and read back each
+    time.
+
+    Returns:
+        list: Names of the datasets that were spilled
+    """
+    used = st.session_state.pop("datasets_used_this_run", set())
+    if _record_store() is not None or SESSION_MEMORY_BUDGET_MB is None:
+        return []
+
+    budget = SESSION_MEMORY_BUDGET_MB * 1024 * 1024
+    sizes = {name: dataset_memory(name) for name in DATASETS}
+    total = sum(sizes.values())
+
+    access = st.session_state.get("dataset_access", {})
+    spilled = []
+    for name in sorted(DATASETS, key=lambda name: access.get(name, 0)):
+        if total <= budget:
+            break
+        if sizes[name] and name not in used and spill_dataset(name):
+            total -= sizes[name]
+            spilled.append(name)
+    return spilled
@@ -0,0 +1,107 @@
+"""
+Content-hash cache for processed ingestion results.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from src.config import FIELD_MAPPING, REQUIRED_CLIENT_FIELDS, PROVIDERID, PROVIDERLOCATIONID
+
+def ingestion_cache_key(data, *options):
+    """
+    Build a cache key from the raw upload and the mapping configuration.
+
+    Args:
+        data (bytes, str or list): Raw uploaded file bytes or pasted text, or a
+            list of them for multi-file uploads
+        *options: Additional settings that change the processed output
+            (e.g. source type, parser engine)
+
+    Returns:
+        str: Hex digest identifying the input and configuration
+    """
+    parts = data if isinstance(data, list) else [data]
+
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # Include the length so that file boundaries are part of the key
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    config = (
+        sorted(FIELD_MAPPING.items()),
+        REQUIRED_CLIENT_FIELDS,
+        PROVIDERID,
+        PROVIDERLOCATIONID,
+        options
+    )
+    digest.update(repr(config).encode("utf-8"))
+    return digest.hexdigest()
+
+class IngestionCache:
+    """
+    Bounded LRU cache of (clients_df, admissions_df) results keyed by content hash.
+
+    Safe to share between threads. With copy_results=False the cached frames
+    are handed out as they are, so one parsed roster is held once no matter
+    how many sessions load it; callers must then treat them as read-only.
+    """
+    def __init__(self, max_entries=4, copy_results=True):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Number of results kept before the least recently
+                used one is evicted
+            copy_results (bool): Store and return copies of the frames
+        """
+        self.max_entries = max_entries
+        self.copy_results = copy_results
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a cached result.
+
+        Args:
+            key (str): Cache key from ingestion_cache_key
+
+        Returns:
+            tuple or None: (clients_df, admissions_df), or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+
+            self._entries.move_to_end(key)
+            clients_df, admissions_df = self._entries[key]
+        if self.copy_results:
+            # Hand out copies so later edits do not leak into the cache
+            return clients_df.copy(), admissions_df.copy()
+        return clients_df, admissions_df
+
+    def put(self, key, clients_df, admissions_df):
+        """
+        Store a result, evicting the least recently used entry if full.
+
+        Args:
+            key (str): Cache key from ingestion_cache_key
+            clients_df (pd.DataFrame): Processed client data
+            admissions_df (pd.DataFrame): Processed admission data
+        """
+        if self.copy_results:
+            clients_df, admissions_df = clients_df.copy(), admissions_df.copy()
+        with self._lock:
+            self._entries[key] = (clients_df, admissions_df)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
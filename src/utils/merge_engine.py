@@ -0,0 +1,270 @@
+"""
+Keyed upsert of re-ingested data into existing session datasets.
+"""
+import numpy as np
+import pandas as pd
+
+CLIENT_KEY = ["ProviderClientId"]
+ADMISSION_KEY = ["ProviderClientId", "AdmissionDate"]
+
+def _row_hashes(df, columns):
+    """
+    Hash the given columns of each row.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame
+        columns (list): Columns to include in the hash
+
+    Returns:
+        np.ndarray: One uint64 hash per row
+    """
+    values = df[columns].astype(object).fillna('')
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+def _match_positions(existing_df, incoming_df, key_columns, key_index=None):
+    """
+    Find the last existing row with the key of each incoming row.
+
+    Args:
+        existing_df (pd.DataFrame): Current data with a RangeIndex
+        incoming_df (pd.DataFrame): Rows to match
+        key_columns (list): Columns that identify a record
+        key_index (dict, optional): Value of the first key column -> positions
+            of the existing rows holding it (see record_index); when given,
+            only the candidate rows are compared, so the cost follows the
+            number of incoming rows
+
+    Returns:
+        np.ndarray: Position of the matching existing row per incoming row, NaN where none
+    """
+    if key_index is not None:
+        matched = np.full(len(incoming_df), np.nan)
+        other_columns = key_columns[1:]
+        other_values = [existing_df[col] for col in other_columns]
+        for row, key in enumerate(incoming_df[key_columns].itertuples(index=False, name=None)):
+            for position in reversed(key_index.get(key[0], [])):
+                if all(values.iat[position] == value for values, value in zip(other_values, key[1:])):
+                    matched[row] = position
+                    break
+        return matched
+
+    if len(key_columns) == 1:
+        existing_keys = pd.Index(existing_df[key_columns[0]])
+        incoming_keys = pd.Index(incoming_df[key_columns[0]])
+    else:
+        existing_keys = pd.MultiIndex.from_frame(existing_df[key_columns])
+        incoming_keys = pd.MultiIndex.from_frame(incoming_df[key_columns])
+    positions = pd.Series(np.arange(len(existing_df)), index=existing_keys)
+    positions = positions[~positions.index.duplicated(keep='last')]
+    return positions.reindex(incoming_keys).to_numpy().astype(float)
+
+def plan_upsert(existing_df, incoming_df, key_columns, key_index=None):
+    """
+    Work out how merging incoming rows by key changes an existing DataFrame.
+
+    Rows whose key is not present are inserted, rows whose key is present
+    and whose values differ are updated in place, and rows that hash the
+    same as the existing row are skipped. Columns only present in the
+    existing data (e.g. fields filled in through record creation) are kept.
+    Rows with a blank key cannot be matched; they are inserted unless an
+    identical row already exists. Only the incoming rows and the matched
+    existing rows are compared, so the cost follows the size of the
+    incoming data.
+
+    Args:
+        existing_df (pd.DataFrame): Current data
+        incoming_df (pd.DataFrame): Newly ingested data
+        key_columns (list): Columns that identify a record
+        key_index (dict, optional): Index of the first key column of existing_df,
+            for matching a few incoming rows without scanning the existing ones
+
+    Returns:
+        dict: "replace" (pd.DataFrame or None, new contents when the existing
+            data cannot be matched against), "updates" (dict, existing row
+            position -> {column: new value} for the cells that change),
+            "inserts" (pd.DataFrame, rows to append), "new_columns" (list,
+            incoming columns the existing data lacks) and "counts" (dict with
+            "inserted", "updated" and "skipped" row counts)
+    """
+    plan = {
+        "replace": None,
+        "updates": {},
+        "inserts": incoming_df.iloc[:0],
+        "new_columns": [],
+        "counts": {"inserted": 0, "updated": 0, "skipped": 0}
+    }
+    counts = plan["counts"]
+
+    if incoming_df.empty or not all(col in incoming_df.columns for col in key_columns):
+        counts["skipped"] = len(incoming_df)
+        return plan
+
+    if existing_df.empty or not all(col in existing_df.columns for col in key_columns):
+        counts["inserted"] = len(incoming_df)
+        # Keep the incoming frame itself when possible; it may be shared between sessions
+        if not incoming_df.index.equals(pd.RangeIndex(len(incoming_df))):
+            incoming_df = incoming_df.reset_index(drop=True)
+        plan["replace"] = incoming_df
+        return plan
+
+    incoming_df = incoming_df.reset_index(drop=True)
+    existing_df = existing_df.reset_index(drop=True)
+    compare_columns = list(incoming_df.columns)
+    plan["new_columns"] = [col for col in compare_columns if col not in existing_df.columns]
+    # Columns only the incoming data has count as blank in the existing rows
+    existing_view = existing_df.reindex(columns=compare_columns, fill_value='') if plan["new_columns"] else existing_df
+
+    blank_key = incoming_df[key_columns].eq('').any(axis=1)
+    keyed = incoming_df[~blank_key].drop_duplicates(subset=key_columns, keep='last')
+    unkeyed = incoming_df[blank_key]
+
+    matched_positions = _match_positions(existing_df, keyed, key_columns, key_index)
+
+    is_match = ~np.isnan(matched_positions)
+    matched = keyed[is_match]
+    target_positions = matched_positions[is_match].astype(np.int64)
+
+    # Only rows whose contents changed are written back, and of those only the differing cells
+    current = existing_view.iloc[target_positions]
+    changed = _row_hashes(matched, compare_columns) != _row_hashes(current, compare_columns)
+    if changed.any():
+        new_values = matched[changed][compare_columns].astype(object).fillna('').to_numpy()
+        old_values = current[changed][compare_columns].astype(object).fillna('').to_numpy()
+        for position, new_row, old_row in zip(target_positions[changed], new_values, old_values):
+            plan["updates"][int(position)] = {
+                col: new for col, new, old in zip(compare_columns, new_row, old_row) if new != old
+            }
+
+    # Rows without a usable key are only added if no identical row exists
+    new_unkeyed = unkeyed
+    if not unkeyed.empty:
+        existing_hashes = set(_row_hashes(existing_view, compare_columns))
+        new_unkeyed = unkeyed[~pd.Series(_row_hashes(unkeyed, compare_columns)).isin(existing_hashes).to_numpy()]
+
+    plan["inserts"] = pd.concat([keyed[~is_match], new_unkeyed], ignore_index=True)
+    counts["inserted"] = len(plan["inserts"])
+    counts["updated"] = int(changed.sum())
+    counts["skipped"] = len(incoming_df) - counts["inserted"] - counts["updated"]
+    return plan
+
+def apply_upsert(existing_df, plan):
+    """
+    Build the merged DataFrame of an upsert plan.
+
+    Args:
+        existing_df (pd.DataFrame): Data the plan was made for
+        plan (dict): Result of plan_upsert
+
+    Returns:
+        pd.DataFrame: Merged data
+    """
+    if plan["replace"] is not None:
+        return plan["replace"]
+
+    merged_df = existing_df.reset_index(drop=True)
+    for col in plan["new_columns"]:
+        merged_df[col] = ''
+
+    columns = dict.fromkeys(col for values in plan["updates"].values() for col in values)
+    for col in columns:
+        series = merged_df[col].copy()
+        if not (pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series)):
+            series = series.astype(object)
+        positions = [position for position, values in plan["updates"].items() if col in values]
+        series.iloc[positions] = [plan["updates"][position][col] for position in positions]
+        merged_df[col] = series
+
+    if not plan["inserts"].empty:
+        merged_df = pd.concat(
+            [merged_df, plan["inserts"].reindex(columns=merged_df.columns, fill_value='')], ignore_index=True
+        )
+    return merged_df
+
+def upsert_records(existing_df, incoming_df, key_columns):
+    """
+    Merge incoming rows into an existing DataFrame by key.
+
+    See plan_upsert for how rows are matched.
+
+    Args:
+        existing_df (pd.DataFrame): Current data
+        incoming_df (pd.DataFrame): Newly ingested data
+        key_columns (list): Columns that identify a record
+
+    Returns:
+        tuple: (merged_df, counts) - merged DataFrame and a dict with
+            "inserted", "updated" and "skipped" row counts
+    """
+    plan = plan_upsert(existing_df, incoming_df, key_columns)
+    if plan["replace"] is None and not (plan["updates"] or len(plan["inserts"]) or plan["new_columns"]):
+        return existing_df, plan["counts"]
+    return apply_upsert(existing_df, plan), plan["counts"]
+
+def resolve_incoming_ids(existing_df, incoming_df, key_columns, id_column, key_index=None, existing_ids=None):
+    """
+    Keep generated IDs of incoming rows from colliding with existing IDs.
+
+    Matches rows the way plan_upsert does. Incoming rows that update an
+    existing row take over its ID, so re-ingesting a file never renames
+    records. Rows that plan_upsert will insert get IDs that are unique
+    against every existing ID.
+
+    Args:
+        existing_df (pd.DataFrame): Current data
+        incoming_df (pd.DataFrame): Newly ingested data, not modified
+        key_columns (list): Columns that identify a record
+        id_column (str): Column holding the generated IDs
+        key_index (dict, optional): Index of the first key column of existing_df,
+            see plan_upsert
+        existing_ids (optional): IDs in use in existing_df, any container
+            supporting "in"; read from existing_df when not given
+
+    Returns:
+        pd.DataFrame: incoming_df itself if no ID changes, otherwise a copy with new IDs
+    """
+    from src.data_models import resolve_admission_id_collisions
+
+    # In these cases plan_upsert keeps one side only, so IDs cannot collide
+    if (incoming_df.empty or existing_df.empty or id_column not in incoming_df.columns
+            or id_column not in existing_df.columns
+            or not all(col in incoming_df.columns and col in existing_df.columns for col in key_columns)):
+        return incoming_df
+
+    existing = existing_df.reset_index(drop=True)
+    incoming = incoming_df.reset_index(drop=True)
+    matched_positions = _match_positions(existing, incoming, key_columns, key_index)
+
+    blank_key = incoming[key_columns].eq('').any(axis=1).to_numpy()
+    is_match = ~np.isnan(matched_positions) & ~blank_key
+    matched_ids = np.full(len(incoming), '', dtype=object)
+    matched_ids[is_match] = (
+        existing[id_column].iloc[matched_positions[is_match].astype(np.int64)].fillna('').astype(str).to_numpy()
+    )
+    takes_existing_id = is_match & (matched_ids != '')
+
+    # Rows without a key are skipped when an identical row exists, so they keep their ID
+    kept = takes_existing_id.copy()
+    if blank_key.any():
+        compare_columns = list(incoming.columns)
+        existing_hashes = set(_row_hashes(existing.reindex(columns=compare_columns, fill_value=''), compare_columns))
+        unkeyed_hashes = pd.Series(_row_hashes(incoming[blank_key], compare_columns))
+        kept[blank_key] = unkeyed_hashes.isin(existing_hashes).to_numpy()
+
+    if existing_ids is None:
+        existing_ids = set(existing[id_column].fillna('').astype(str))
+    ids = incoming[id_column].copy()
+    ids[takes_existing_id] = matched_ids[takes_existing_id]
+    ids[~kept] = resolve_admission_id_collisions(ids[~kept], _Taken(existing_ids, set(ids[kept])))
+
+    if ids.equals(incoming[id_column]):
+        return incoming_df
+    incoming[id_column] = ids
+    return incoming
+
+class _Taken:
+    """Membership test over two ID containers without merging them."""
+    def __init__(self, *containers):
+        self.containers = containers
+
+    def __contains__(self, value):
+        return any(value in container for container in self.containers)
@@ -0,0 +1,338 @@
+"""
+SQLite-backed storage for the client, admission, survey and discharge datasets.
+"""
+import sqlite3
+import threading
+import pandas as pd
+
+# Columns that get an index in every table that has them
+INDEXED_COLUMNS = ["ProviderClientId", "ProviderAdmissionId"]
+
+# Internal row number column, keeps rows in insertion order
+ROW_ID = "_rowid"
+
+# Table holding a change counter per dataset
+VERSION_TABLE = "_dataset_versions"
+
+def _quote(identifier):
+    """Quote a table or column name for use in SQL."""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+def _to_sql_value(value):
+    """Convert a value to a type sqlite3 accepts, with missing values as NULL."""
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, (str, int, float)):
+        return value
+    if hasattr(value, "item"):
+        # numpy scalars
+        return _to_sql_value(value.item())
+    return str(value)
+
+class RecordStore:
+    """
+    Datasets stored as tables of a local SQLite file in WAL mode.
+
+    Each dataset is one table named after its session state key. Columns are
+    created as records with new fields arrive, and ProviderClientId and
+    ProviderAdmissionId are indexed so lookups do not scan the table. Reads
+    can be limited to some columns and to a page of rows. The connection is
+    shared between Streamlit's script threads behind a lock.
+    """
+    def __init__(self, path):
+        """
+        Open (or create) the store.
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+
+    def _columns(self, name):
+        """Return the data columns of a table, or None if it does not exist."""
+        info = self._conn.execute(f"PRAGMA table_info({_quote(name)})").fetchall()
+        if not info:
+            return None
+        return [row[1] for row in info if row[1] != ROW_ID]
+
+    def _ensure_columns(self, name, columns):
+        """Create the table and add any missing columns and indexes."""
+        existing = self._columns(name)
+        if existing is None:
+            self._conn.execute(f"CREATE TABLE {_quote(name)} ({ROW_ID} INTEGER PRIMARY KEY)")
+            existing = []
+
+        for col in columns:
+            if col not in existing:
+                self._conn.execute(f"ALTER TABLE {_quote(name)} ADD COLUMN {_quote(col)}")
+                existing.append(col)
+                if col in INDEXED_COLUMNS:
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{name}_{col}')} ON {_quote(name)} ({_quote(col)})"
+                    )
+        return existing
+
+    def _bump_version(self, name):
+        """Increment the change counter of a dataset."""
+        self._conn.execute(
+            f"INSERT INTO {VERSION_TABLE} (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (name,)
+        )
+
+    def _insert(self, name, columns, rows):
+        """Insert rows (sequences ordered like columns) with one executemany call."""
+        placeholders = ", ".join("?" for _ in columns)
+        column_list = ", ".join(_quote(col) for col in columns)
+        self._conn.executemany(
+            f"INSERT INTO {_quote(name)} ({column_list}) VALUES ({placeholders})",
+            ([_to_sql_value(value) for value in row] for row in rows)
+        )
+
+    def append(self, name, records):
+        """
+        Add records to a dataset.
+
+        Args:
+            name (str): Dataset name
+            records (list): Record dicts mapping column name to value
+        """
+        if not records:
+            return
+
+        columns = list(dict.fromkeys(col for record in records for col in record))
+        with self._lock, self._conn:
+            self._ensure_columns(name, columns)
+            self._insert(name, columns, ([record.get(col) for col in columns] for record in records))
+            self._bump_version(name)
+
+    def _update_rows(self, name, statements):
+        """Run UPDATE statements grouped by changed columns, {columns: [[values..., rowid], ...]}."""
+        for changed_columns, params in statements.items():
+            assignments = ", ".join(f"{_quote(col)} = ?" for col in changed_columns)
+            self._conn.executemany(f"UPDATE {_quote(name)} SET {assignments} WHERE {ROW_ID} = ?", params)
+
+    def replace(self, name, df):
+        """
+        Replace the contents of a dataset.
+
+        The new rows are compared with the stored ones by position and only
+        the differences are written: changed cells are updated, rows past the
+        end are inserted or deleted and columns df does not have are dropped.
+        Columns keep their stored order, new ones are added at the end. The
+        version only changes if something was written.
+
+        Args:
+            name (str): Dataset name
+            df (pd.DataFrame): New contents
+        """
+        columns = [str(col) for col in df.columns]
+        with self._lock, self._conn:
+            stored_columns = self._columns(name)
+            changed = stored_columns is None or set(stored_columns) != set(columns)
+            for col in list(self._ensure_columns(name, columns)):
+                if col not in columns:
+                    self._conn.execute(f"DROP INDEX IF EXISTS {_quote(f'idx_{name}_{col}')}")
+                    self._conn.execute(f"ALTER TABLE {_quote(name)} DROP COLUMN {_quote(col)}")
+
+            select_list = ", ".join([ROW_ID] + [_quote(col) for col in columns])
+            stored_rows = self._conn.execute(f"SELECT {select_list} FROM {_quote(name)} ORDER BY {ROW_ID}").fetchall()
+
+            # Rows changing the same set of columns share one statement
+            statements = {}
+            inserts = []
+            for position, row in enumerate(df.itertuples(index=False, name=None)):
+                values = [_to_sql_value(value) for value in row]
+                if position >= len(stored_rows):
+                    inserts.append(values)
+                    continue
+                stored = stored_rows[position]
+                changed_columns = tuple(col for col, value, old in zip(columns, values, stored[1:]) if value != old)
+                if changed_columns:
+                    statements.setdefault(changed_columns, []).append(
+                        [value for col, value in zip(columns, values) if col in changed_columns] + [stored[0]]
+                    )
+            self._update_rows(name, statements)
+            if len(stored_rows) > len(df):
+                self._conn.execute(f"DELETE FROM {_quote(name)} WHERE {ROW_ID} >= ?", (stored_rows[len(df)][0],))
+            if inserts and columns:
+                self._insert(name, columns, inserts)
+
+            if changed or statements or inserts or len(stored_rows) != len(df):
+                self._bump_version(name)
+
+    def update(self, name, updates):
+        """
+        Change individual cells of a dataset.
+
+        Args:
+            name (str): Dataset name
+            updates (dict): Row position -> {column: new value}
+        """
+        if not updates:
+            return
+
+        columns = list(dict.fromkeys(col for values in updates.values() for col in values))
+        with self._lock, self._conn:
+            self._ensure_columns(name, columns)
+            # Positions are resolved against one read of the row numbers
+            # instead of an OFFSET query per row
+            row_ids = [row[0] for row in self._conn.execute(f"SELECT {ROW_ID} FROM {_quote(name)} ORDER BY {ROW_ID}")]
+
+            # Rows changing the same set of columns share one statement
+            statements = {}
+            for position, values in updates.items():
+                if 0 <= position < len(row_ids):
+                    params = [_to_sql_value(value) for value in values.values()] + [row_ids[position]]
+                    statements.setdefault(tuple(values), []).append(params)
+            self._update_rows(name, statements)
+            self._bump_version(name)
+
+    def _read(self, name, columns=None, limit=None, offset=0):
+        """
+        Read some columns of a range of rows.
+
+        Args:
+            name (str): Dataset name
+            columns (list, optional): Columns to read, all when None; columns
+                the table does not have are returned empty
+            limit (int, optional): Maximum number of rows, all when None
+            offset (int): Rows to skip
+
+        Returns:
+            pd.DataFrame: Records in insertion order
+        """
+        with self._lock:
+            stored_columns = self._columns(name)
+            if not stored_columns:
+                return pd.DataFrame(columns=columns) if columns is not None else pd.DataFrame()
+            selected = stored_columns if columns is None else [col for col in columns if col in stored_columns]
+            # Row numbers stand in when none of the columns exist, so the row count is kept
+            query = f"SELECT {self._select_list(selected) if selected else ROW_ID} FROM {_quote(name)} ORDER BY {ROW_ID}"
+            params = ()
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                params = (limit, offset)
+            rows = self._conn.execute(query, params).fetchall()
+        if not selected:
+            return pd.DataFrame(index=range(len(rows)), columns=columns)
+        df = pd.DataFrame(rows, columns=selected)
+        return df if columns is None or selected == list(columns) else df.reindex(columns=columns)
+
+    def load(self, name, columns=None):
+        """
+        Read a whole dataset, or some of its columns.
+
+        Args:
+            name (str): Dataset name
+            columns (list, optional): Columns to read, all when None
+
+        Returns:
+            pd.DataFrame: Records in insertion order, empty if the dataset does not exist
+        """
+        return self._read(name, columns)
+
+    def read_page(self, name, offset, limit, columns=None):
+        """
+        Read a range of rows without loading the rest of the dataset.
+
+        Args:
+            name (str): Dataset name
+            offset (int): Position of the first row
+            limit (int): Maximum number of rows
+            columns (list, optional): Columns to read, all when None
+
+        Returns:
+            pd.DataFrame: Records in insertion order, with a RangeIndex from 0
+        """
+        return self._read(name, columns, limit, offset)
+
+    def find(self, name, column, value):
+        """
+        Read the records whose column equals a value.
+
+        Args:
+            name (str): Dataset name
+            column (str): Column to match, an indexed column for fast lookups
+            value: Value to match
+
+        Returns:
+            pd.DataFrame: Matching records in insertion order
+        """
+        with self._lock:
+            columns = self._columns(name)
+            if columns is None or column not in columns:
+                return pd.DataFrame(columns=columns or [])
+            rows = self._conn.execute(
+                f"SELECT {self._select_list(columns)} FROM {_quote(name)} WHERE {_quote(column)} = ? ORDER BY {ROW_ID}",
+                (_to_sql_value(value),)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def count(self, name):
+        """
+        Count the records of a dataset.
+
+        Args:
+            name (str): Dataset name
+
+        Returns:
+            int: Number of records
+        """
+        with self._lock:
+            if self._columns(name) is None:
+                return 0
+            return self._conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0]
+
+    def column_values(self, name, column):
+        """
+        List the values of one column of a dataset.
+
+        Args:
+            name (str): Dataset name
+            column (str): Column name
+
+        Returns:
+            list: Column values in insertion order
+        """
+        with self._lock:
+            columns = self._columns(name)
+            if columns is None or column not in columns:
+                return []
+            rows = self._conn.execute(f"SELECT {_quote(column)} FROM {_quote(name)} ORDER BY {ROW_ID}")
+            return [row[0] for row in rows]
+
+    def version(self, name):
+        """
+        Return the change counter of a dataset.
+
+        Every write that changes the dataset, from any session, increments it.
+
+        Args:
+            name (str): Dataset name
+
+        Returns:
+            int: Current version, 0 if the dataset was never written
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT version FROM {VERSION_TABLE} WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _select_list(columns):
+        """Column list for SELECT statements."""
+        return ", ".join(_quote(col) for col in columns)
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
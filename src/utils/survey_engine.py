@@ -1,11 +1,137 @@
 """
 Survey engine for rendering and validating admission survey forms.
 """
+import ast
 import streamlit as st
 import json
 import datetime
+from src.config import PROVIDERID
 from src.data_models import validate_date, format_date
 
+def build_survey_rows(client_id, admission_id, formatted_answers):
+    """
+    Build survey answer records, one row per answered question.
+    
+    Args:
+        client_id (str): Provider client ID
+        admission_id (str): Provider admission ID
+        formatted_answers (dict): Answers from SurveyEngine.get_formatted_answers
+        
+    Returns:
+        list: Survey answer row dictionaries
+    """
+    survey_rows = []
+    
+    for seq_num, value in formatted_answers.items():
+        # Skip empty answers
+        if value == "":
+            continue
+            
+        survey_row = {
+            "RecordType": "SurAns",
+            "ProviderId": PROVIDERID,
+            "ProviderClientId": client_id,
+            "ProviderAdmissionId": admission_id,
+            "QuestionGroupId": "1",  # 1 for Admission
+            "ExportSequenceNumber": seq_num,
+            "AnswerValue": value
+        }
+        survey_rows.append(survey_row)
+    
+    return survey_rows
+
+# Functions rule conditions may call, besides answers.get
+CONDITION_FUNCTIONS = {"any": any, "all": all, "len": len}
+
+# Variables available to rule conditions
+CONDITION_VARIABLES = ("answers", "dependencies", "value")
+
+# Expression nodes allowed in rule conditions
+_CONDITION_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.IfExp,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.Call, ast.Attribute, ast.Name, ast.Load, ast.Store, ast.Constant, ast.List, ast.Tuple,
+    ast.ListComp, ast.GeneratorExp, ast.comprehension
+)
+
+# Compiled conditions per survey schema, keyed by id(); the schema is kept
+# in the entry so its id cannot be reused by another object
+_COMPILED_CONDITIONS = {}
+
+def compile_condition(condition):
+    """
+    Compile a rule condition into a function.
+    
+    The condition is parsed once and checked against an allowlist: boolean
+    logic, comparisons, literals, list comprehensions, answers.get() and the
+    functions in CONDITION_FUNCTIONS. The variables in CONDITION_VARIABLES
+    become the function's arguments, so value is passed as a real variable
+    instead of being pasted into the expression.
+    
+    Args:
+        condition (str): Python expression, e.g. "answers.get('73', '') == value"
+        
+    Returns:
+        callable: Function of (answers, dependencies, value) returning the condition result
+        
+    Raises:
+        SyntaxError: If the condition is not a valid expression
+        ValueError: If the condition uses anything outside the allowlist
+    """
+    tree = ast.parse(condition.strip(), mode="eval")
+    
+    # Names bound by comprehensions (e.g. dep in "for dep in dependencies")
+    bound_names = {
+        node.id for comp in ast.walk(tree) if isinstance(comp, ast.comprehension)
+        for node in ast.walk(comp.target) if isinstance(node, ast.Name)
+    }
+    allowed_names = set(CONDITION_VARIABLES) | set(CONDITION_FUNCTIONS) | bound_names
+    
+    for node in ast.walk(tree):
+        if not isinstance(node, _CONDITION_NODES):
+            raise ValueError(f"Unsupported expression {type(node).__name__} in condition: {condition}")
+        if isinstance(node, ast.Name) and node.id not in allowed_names:
+            raise ValueError(f"Unknown name '{node.id}' in condition: {condition}")
+        if isinstance(node, ast.Attribute) and not (
+            isinstance(node.value, ast.Name) and node.value.id == "answers" and node.attr == "get"
+        ):
+            raise ValueError(f"Only answers.get may be used as an attribute in condition: {condition}")
+        if isinstance(node, ast.Call):
+            is_answers_get = isinstance(node.func, ast.Attribute)
+            is_function = isinstance(node.func, ast.Name) and node.func.id in CONDITION_FUNCTIONS
+            if not (is_answers_get or is_function) or node.keywords:
+                raise ValueError(f"Unsupported call in condition: {condition}")
+    
+    source = f"lambda {', '.join(CONDITION_VARIABLES)}: ({condition.strip()})"
+    return eval(compile(source, "<survey rule>", "eval"), {"__builtins__": {}, **CONDITION_FUNCTIONS})
+
+def compile_survey_conditions(survey_questions):
+    """
+    Compile the rule conditions of a survey schema, once per schema.
+    
+    Args:
+        survey_questions (dict): Survey schema with a "questions" list
+        
+    Returns:
+        dict: Condition text -> compiled function, None for conditions that
+            failed to compile
+    """
+    entry = _COMPILED_CONDITIONS.get(id(survey_questions))
+    if entry is None or entry[0] is not survey_questions:
+        conditions = {}
+        for question in survey_questions["questions"]:
+            for rule in question.get("rules") or []:
+                condition = rule.get("condition")
+                if condition and condition not in conditions:
+                    try:
+                        conditions[condition] = compile_condition(condition)
+                    except (SyntaxError, ValueError) as e:
+                        print(f"Error compiling condition: {e}")
+                        conditions[condition] = None
+        entry = (survey_questions, conditions)
+        _COMPILED_CONDITIONS[id(survey_questions)] = entry
+    return entry[1]
+
 class SurveyEngine:
     """
     Engine for rendering and handling admission survey forms.
@@ -18,6 +144,7 @@ class SurveyEngine:
             survey_questions (dict): Dictionary of survey questions and properties
         """
         self.questions = survey_questions["questions"]
+        self.conditions = compile_survey_conditions(survey_questions)
         self.answers = {}
         self.errors = {}
         
@@ -86,6 +213,15 @@ class SurveyEngine:
                 else:
                     unmatched_questions.append(question_text)
             
+            if not formatted_data:
+                # Nothing would be imported, which is almost always the wrong file or format
+                if not unmatched_questions:
+                    return False, "No survey answers found in input"
+                message = f"None of the {len(unmatched_questions)} questions match a survey question: {', '.join(unmatched_questions[:3])}"
+                if len(unmatched_questions) > 3:
+                    message += f" and {len(unmatched_questions) - 3} more"
+                return False, message
+            
             # Import valid answers
             self.answers.update(formatted_data)
             
@@ -120,27 +256,21 @@ class SurveyEngine:
         if not rule or "dependencies" not in rule:
             return False
             
-        dependencies = rule["dependencies"]
-        condition = rule["condition"]
-        
-        # Parse condition and evaluate it
-        if "answers.get" in condition:
-            # This is a complex condition - evaluate it
-            try:
-                # Replace 'value' with the actual value if present in the condition
-                if "value" in condition:
-                    condition = condition.replace("value", f"'{value}'")
-                
-                # Create a local context for evaluation
-                context = {"answers": self.answers, "dependencies": dependencies}
-                result = eval(condition, {"__builtins__": {}}, context)
-                return result
-            except Exception as e:
-                print(f"Error evaluating condition: {e}")
-                return False
-        else:
-            # Simple condition
+        condition = rule.get("condition")
+        if not condition:
+            # A rule without a condition always applies
             return True
+        
+        check = self.conditions.get(condition)
+        if check is None:
+            # Not part of the schema, or failed to compile (reported when compiled)
+            return False
+        
+        try:
+            return bool(check(self.answers, rule["dependencies"], value))
+        except Exception as e:
+            print(f"Error evaluating condition: {e}")
+            return False
     
     def apply_rule_action(self, question, value, rule):
         """
@@ -0,0 +1,125 @@
+"""
+Row-level deltas between versions of a dataset, for undo and redo.
+"""
+import numpy as np
+import pandas as pd
+
+def _row_hashes(df, columns):
+    """
+    Hash the given columns of each row.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame
+        columns (list): Columns to include, missing ones count as empty
+
+    Returns:
+        np.ndarray: One uint64 hash per row
+    """
+    values = df.reindex(columns=columns).astype(object)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+def make_delta(target_df, current_df):
+    """
+    Describe how to turn current_df back into target_df.
+
+    Only the rows that differ are stored: target rows at positions where the
+    two frames disagree, plus the target rows past the end of current_df.
+    The stored frames are slices of target_df, which copy-on-write lets
+    share memory with it.
+
+    Args:
+        target_df (pd.DataFrame): Version to restore
+        current_df (pd.DataFrame): Version the delta is applied to
+
+    Returns:
+        dict: Delta for apply_delta
+    """
+    columns = list(target_df.columns)
+    common_length = min(len(target_df), len(current_df))
+
+    target_hashes = _row_hashes(target_df.iloc[:common_length], columns)
+    current_hashes = _row_hashes(current_df.iloc[:common_length], columns)
+    positions = np.flatnonzero(target_hashes != current_hashes)
+
+    return {
+        "columns": columns,
+        "dtypes": target_df.dtypes.to_dict(),
+        "length": len(target_df),
+        "positions": positions,
+        "rows": target_df.iloc[positions],
+        "tail": target_df.iloc[len(current_df):]
+    }
+
+def make_row_delta(target_df, positions):
+    """
+    Describe how to restore some rows of target_df after they are changed in place.
+
+    Unlike make_delta this does not compare the frames, so it costs the
+    same however large the dataset is. The row count must stay the same.
+
+    Args:
+        target_df (pd.DataFrame): Version to restore
+        positions (list): Positions of the rows that are about to change
+
+    Returns:
+        dict: Delta for apply_delta
+    """
+    positions = np.asarray(sorted(positions), dtype=np.intp)
+    return {
+        "columns": list(target_df.columns),
+        "dtypes": target_df.dtypes.to_dict(),
+        "length": len(target_df),
+        "positions": positions,
+        "rows": target_df.iloc[positions],
+        "tail": target_df.iloc[len(target_df):]
+    }
+
+def apply_delta(current_df, delta):
+    """
+    Rebuild the target version of a dataset from the current one.
+
+    Args:
+        current_df (pd.DataFrame): Version the delta was made against
+        delta (dict): Result of make_delta
+
+    Returns:
+        pd.DataFrame: The target version
+    """
+    kept = current_df.iloc[:min(delta["length"], len(current_df))]
+
+    columns = {}
+    for col in delta["columns"]:
+        if col in kept.columns:
+            values = kept[col].to_numpy(dtype=object, copy=True)
+        else:
+            values = np.full(len(kept), np.nan, dtype=object)
+        values[delta["positions"]] = delta["rows"][col].to_numpy(dtype=object)
+        columns[col] = values
+
+    restored = pd.DataFrame(columns, columns=delta["columns"])
+    if not delta["tail"].empty:
+        restored = pd.concat([restored, delta["tail"].astype(object)], ignore_index=True)
+
+    # Restore the original column types where the values allow it
+    for col, dtype in delta["dtypes"].items():
+        try:
+            restored[col] = restored[col].astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    return restored
+
+def delta_size(delta):
+    """
+    Estimate the memory held by a delta.
+
+    Args:
+        delta (dict): Result of make_delta
+
+    Returns:
+        int: Size in bytes
+    """
+    return int(
+        delta["rows"].memory_usage(deep=True).sum()
+        + delta["tail"].memory_usage(deep=True).sum()
+        + delta["positions"].nbytes
+    )
@@ -6,6 +6,10 @@ from src.components.data_ingestion import show_data_ingestion_page
 from src.components.data_table import show_data_table_page
 from src.components.record_creation import show_record_creation_page
 from src.components.data_export import show_data_export_page
+from src.config import SESSION_MEMORY_BUDGET_MB
+from src.utils.dataset_store import (
+    dataset_length, dataset_memory, enforce_memory_budget, is_spilled, journal_labels, redo, undo
+)
 
 # Set page title and icon
 st.set_page_config(
@@ -31,6 +35,12 @@ def init_session_state():
     if 'page' not in st.session_state:
         st.session_state.page = "Data Ingestion"
 
+def _memory_text(name):
+    """Describe the memory a dataset uses for the sidebar."""
+    if is_spilled(name):
+        return "on disk"
+    return f"{dataset_memory(name) / (1024 * 1024):.1f} MB"
+
 def setup_sidebar():
     """Configure the sidebar navigation and statistics."""
     # Create sidebar for navigation
@@ -50,10 +60,34 @@ def setup_sidebar():
     # Display data stats in sidebar
     st.sidebar.markdown("---")
     st.sidebar.subheader("Data Statistics")
-    st.sidebar.markdown(f"**Clients:** {len(st.session_state.clients_df)} records")
-    st.sidebar.markdown(f"**Admissions:** {len(st.session_state.admissions_df)} records")
-    st.sidebar.markdown(f"**Surveys:** {len(st.session_state.survey_df)} records")
-    st.sidebar.markdown(f"**Discharges:** {len(st.session_state.discharges_df)} records")
+    datasets = [
+        ("Clients", "clients_df"), ("Admissions", "admissions_df"),
+        ("Surveys", "survey_df"), ("Discharges", "discharges_df")
+    ]
+    for label, name in datasets:
+        st.sidebar.markdown(f"**{label}:** {dataset_length(name)} records ({_memory_text(name)})")
+    
+    total_memory = sum(dataset_memory(name) for _, name in datasets)
+    budget_text = f" of {SESSION_MEMORY_BUDGET_MB} MB" if SESSION_MEMORY_BUDGET_MB is not None else ""
+    st.sidebar.caption(f"Session data in memory: {total_memory / (1024 * 1024):.1f} MB{budget_text}")
+    
+    # Undo/redo of data changes made on any page
+    undo_label, redo_label = journal_labels()
+    undo_col, redo_col = st.sidebar.columns(2)
+    undo_clicked = undo_col.button(
+        "Undo", disabled=undo_label is None, help=f"Undo {undo_label}" if undo_label else None
+    )
+    redo_clicked = redo_col.button(
+        "Redo", disabled=redo_label is None, help=f"Redo {redo_label}" if redo_label else None
+    )
+    if undo_clicked or redo_clicked:
+        if undo_clicked:
+            undo()
+        else:
+            redo()
+        # Drop pending table edits so they are not applied again on top of the restored data
+        st.session_state.pop("client_data_editor", None)
+        st.rerun()
 
 def main():
     """Main application entry point."""
@@ -76,6 +110,9 @@ def main():
         show_record_creation_page()
     elif st.session_state.page == "Data Export":
         show_data_export_page()
+    
+    # Move datasets this run did not read to disk if the session is over its memory budget
+    enforce_memory_budget()
 
 if __name__ == "__main__":
     main()
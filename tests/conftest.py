@@ -0,0 +1,7 @@
+"""
+Shared pytest setup: make the src package importable when running pytest from the repo root.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
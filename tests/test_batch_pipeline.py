@@ -0,0 +1,25 @@
+"""
+Tests for the survey import of src.batch_pipeline.
+"""
+import json
+import pandas as pd
+from src.batch_pipeline import import_surveys
+
+def test_survey_without_known_questions_is_an_error(tmp_path):
+    admissions_df = pd.DataFrame({
+        "ProviderClientId": ["1", "2"],
+        "ProviderAdmissionId": ["A1", "A2"],
+        "AdmissionDate": ["01/02/2024", "01/03/2024"]
+    })
+    survey_path = tmp_path / "surveys.json"
+    survey_path.write_text(json.dumps({
+        "A1": {"Favourite colour": "Blue", "Shoe size": "9"},
+        "A2": {},
+        "A3": {"Favourite colour": "Red"}
+    }))
+    survey_df, errors = import_surveys(str(survey_path), admissions_df)
+    assert survey_df.empty
+    messages = dict(errors)
+    assert messages["A1"].startswith("None of the 2 questions match a survey question")
+    assert messages["A2"] == "No survey answers found in input"
+    assert messages["A3"] == "No matching admission or client"
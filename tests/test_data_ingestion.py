@@ -0,0 +1,52 @@
+"""
+Tests for the TSV loading of src.components.data_ingestion.
+"""
+import pytest
+import streamlit as st
+from src.components import data_ingestion
+from src.utils.dataset_store import dataset_version, get_dataset, journal_labels
+from src.utils.ingestion_cache import ingestion_cache_key
+
+HEADER = "Unique ID\tClient\tDate of Birth\tAdmission Date\tZip\n"
+
+@pytest.fixture(autouse=True)
+def clear_session_state():
+    """Start every test with an empty session."""
+    for key in list(st.session_state):
+        del st.session_state[key]
+    yield
+
+def load(tsv_text):
+    """Load TSV text the way the paste box does."""
+    return data_ingestion._load_tsv(tsv_text, ingestion_cache_key(tsv_text, "tsv", False))
+
+def test_appended_row_is_merged_alone(monkeypatch):
+    tsv_text = HEADER + "".join(f"{i}\tJohn Smith{i}\t1/2/1990\t3/4/2024\t80202\n" for i in range(500))
+    load(tsv_text)
+    stored = get_dataset("clients_df")
+
+    merged_rows = []
+    plan_upsert = data_ingestion.plan_upsert
+    def spy(existing_df, incoming_df, key_columns, **kwargs):
+        merged_rows.append(len(incoming_df))
+        return plan_upsert(existing_df, incoming_df, key_columns, **kwargs)
+    monkeypatch.setattr(data_ingestion, "plan_upsert", spy)
+    set_dataset_calls = []
+    monkeypatch.setattr(data_ingestion, "set_dataset", lambda *args: set_dataset_calls.append(args))
+
+    counts = load(tsv_text + "500\tAnn Lee\t1/2/1990\t3/4/2024\t80202\n")
+    assert merged_rows == [1, 1]
+    assert set_dataset_calls == []
+    assert counts["client_counts"] == {"inserted": 1, "updated": 0, "skipped": 0}
+    clients = get_dataset("clients_df")
+    assert len(clients) == 501
+    assert clients.iloc[:500].equals(stored)
+    assert journal_labels() == ("TSV load", None)
+
+def test_blank_appended_line_adds_no_undo_step():
+    tsv_text = HEADER + "1\tJohn Smith\t1/2/1990\t3/4/2024\t80202\n"
+    load(tsv_text)
+    version = dataset_version("clients_df")
+    load(tsv_text + "\n")
+    assert dataset_version("clients_df") == version
+    assert len(st.session_state["undo_journal"]["undo"]) == 1
@@ -0,0 +1,60 @@
+"""
+Tests for CSV and TSV ingestion in src.utils.data_processing.
+"""
+import pandas as pd
+from src.config import PROVIDERID
+from src.utils.data_processing import process_csv_files, process_tsv_data_incremental, upload_provider
+
+def make_tsv(rows):
+    """Build pasted TSV text with a client ID, name, birth date and admission date per row."""
+    lines = ["Unique ID\tClient\tDOB\tAdmission Date"]
+    lines += [f"{i}\tFirst{i} Last{i}\t1/2/1990\t3/{i % 28 + 1}/2024" for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+def test_single_csv_file_reports_row_progress():
+    source = make_tsv(250).replace("\t", ",").encode("utf-8")
+    calls = []
+    clients_df, _ = process_csv_files([source], chunksize=100,
+                                      progress_callback=lambda rows, fraction: calls.append((rows, fraction)))
+    assert len(clients_df) == 250
+    assert [rows for rows, _ in calls] == [100, 200, 250, 250]
+    assert calls[-1][1] == 1.0
+
+def test_incremental_tsv_chunking_matches_single_pass():
+    text = make_tsv(250)
+    calls = []
+    chunked = process_tsv_data_incremental(text, chunksize=100,
+                                           progress_callback=lambda rows, fraction: calls.append(rows))
+    single = process_tsv_data_incremental(text)
+    pd.testing.assert_frame_equal(chunked[0], single[0])
+    pd.testing.assert_frame_equal(chunked[1], single[1])
+    assert calls == [100, 200, 250, 250]
+
+def test_incremental_tsv_append_is_chunked():
+    text = make_tsv(250)
+    _, _, state = process_tsv_data_incremental(make_tsv(50), chunksize=100)
+    calls = []
+    clients_df, admissions_df, _ = process_tsv_data_incremental(
+        text, state, chunksize=100, progress_callback=lambda rows, fraction: calls.append(rows)
+    )
+    assert calls == [100, 200, 200]
+    assert clients_df["ProviderClientId"].tolist() == [str(i) for i in range(250)]
+    assert admissions_df["ProviderAdmissionId"].is_unique
+
+def test_chunked_csv_keeps_column_values_of_single_pass():
+    # A blank ZIP in the last chunk only must not turn that chunk's ZIPs into floats
+    lines = ["Unique ID,Client,DOB,Admission Date,Zip"]
+    lines += [f"{i},First{i} Last{i},1/2/1990,3/4/2024,{'' if i >= 200 and i % 2 else '80202'}" for i in range(250)]
+    source = ("\n".join(lines) + "\n").encode("utf-8")
+    chunked = process_csv_files([source], chunksize=100)
+    single = process_csv_files([source])
+    pd.testing.assert_frame_equal(chunked[0], single[0])
+    pd.testing.assert_frame_equal(chunked[1], single[1])
+    assert set(chunked[0]["ZipCode"]) == {"80202", ""}
+
+def test_upload_provider_reads_the_provider_column():
+    with_provider = b"Unique ID,Provider ID,Client\n1,P2,Ann Lee\n2,P1,Bo Lee\n3,P2,Cy Lee\n"
+    assert upload_provider([with_provider]) == "P1,P2"
+    assert upload_provider([make_tsv(3).replace("\t", ",").encode("utf-8")]) == PROVIDERID
+    clients_df, admissions_df = process_csv_files([b"Unique ID,Provider ID,Admission Date\n1,P2,1/2/2024\n2,,1/2/2024\n"])
+    assert admissions_df["ProviderId"].tolist() == ["P2", PROVIDERID]
@@ -0,0 +1,94 @@
+"""
+Tests for the undo journal of src.utils.dataset_store.
+"""
+import pandas as pd
+import pytest
+import streamlit as st
+from src.utils.dataset_store import (
+    append_records, dataset_version, get_dataset, journal_action, journal_labels, journal_state, redo, set_dataset,
+    store_normalized, undo, update_cells
+)
+
+@pytest.fixture(autouse=True)
+def clear_session_state():
+    """Start every test with an empty session."""
+    for key in list(st.session_state):
+        del st.session_state[key]
+    yield
+
+def test_undo_redo_undo_of_append_restores_columns():
+    set_dataset("admissions_df", pd.DataFrame({"ProviderClientId": ["1"]}))
+    append_records("admissions_df", [{"ProviderClientId": "2", "Extra": "x"}])
+    undo()
+    redo()
+    assert list(get_dataset("admissions_df").columns) == ["ProviderClientId", "Extra"]
+    undo()
+    assert list(get_dataset("admissions_df").columns) == ["ProviderClientId"]
+    assert get_dataset("admissions_df")["ProviderClientId"].tolist() == ["1"]
+
+def test_journal_state_follows_undo_and_redo():
+    with journal_action("CSV load"):
+        set_dataset("clients_df", pd.DataFrame({"ProviderClientId": ["1"]}))
+        st.session_state["last_csv_ingest"] = {"key": "a", "undone": False}
+        journal_state("last_csv_ingest", {"key": "a", "undone": True})
+    undo()
+    assert st.session_state["last_csv_ingest"]["undone"]
+    redo()
+    assert not st.session_state["last_csv_ingest"]["undone"]
+
+def test_store_normalized_is_not_an_undo_step():
+    with journal_action("TSV load"):
+        set_dataset("clients_df", pd.DataFrame({"ProviderClientId": ["1"], "ZipCode": [None]}))
+    version = dataset_version("clients_df")
+    store_normalized("clients_df", pd.DataFrame({"ProviderClientId": ["1"], "ZipCode": [""]}))
+    assert get_dataset("clients_df")["ZipCode"].tolist() == [""]
+    assert dataset_version("clients_df") == version
+    assert journal_labels() == ("TSV load", None)
+    undo()
+    assert get_dataset("clients_df").empty
+
+def test_record_store_is_read_once_per_version(tmp_path, monkeypatch):
+    from src.utils import dataset_store
+    from src.utils.dataset_store import record_index
+    monkeypatch.setattr(dataset_store, "RECORD_STORE_PATH", str(tmp_path / "records.db"))
+    store = dataset_store._record_store()
+    set_dataset("clients_df", pd.DataFrame({"ProviderClientId": ["1", "2"], "FirstName": ["Ann", "Bo"]}))
+
+    reads = []
+    for method in ("load", "column_values"):
+        original = getattr(store, method)
+        monkeypatch.setattr(store, method, lambda *args, original=original, method=method: (
+            reads.append(method), original(*args))[1])
+    for _ in range(3):
+        get_dataset("clients_df")
+        record_index("clients_df", "ProviderClientId")
+    assert reads == ["load", "column_values"]
+
+    append_records("clients_df", [{"ProviderClientId": "3", "FirstName": "Cy"}])
+    assert get_dataset("clients_df")["ProviderClientId"].tolist() == ["1", "2", "3"]
+    assert record_index("clients_df", "ProviderClientId")["3"] == [2]
+    assert len(reads) == 4
+    store.close()
+
+def test_cell_edits_reuse_the_shared_frame():
+    shared = pd.DataFrame({"ProviderClientId": [str(i) for i in range(1000)], "Gender": [""] * 1000})
+    st.session_state["clients_df"] = shared
+    update_cells("clients_df", {3: {"Gender": "Male"}, 500: {"Gender": "Female"}})
+    clients = get_dataset("clients_df")
+    assert clients["Gender"].iloc[[3, 500]].tolist() == ["Male", "Female"]
+    assert shared["Gender"].eq("").all()
+    # The edited column is spliced from slices of the shared one, not copied
+    for col in ("Gender", "ProviderClientId"):
+        original = shared[col].array.__arrow_array__().chunk(0).buffers()[2].address
+        assert clients[col].array.__arrow_array__().chunk(0).buffers()[2].address == original
+
+def test_column_values_counts_as_a_use():
+    from src.utils.dataset_store import column_values, enforce_memory_budget
+    set_dataset("clients_df", pd.DataFrame({"ProviderClientId": ["1"]}))
+    set_dataset("admissions_df", pd.DataFrame({"ProviderClientId": ["1"]}))
+    get_dataset("clients_df")
+    enforce_memory_budget()
+    column_values("admissions_df", "ProviderClientId")
+    access = st.session_state["dataset_access"]
+    assert access["admissions_df"] > access.get("clients_df", 0)
+    assert "admissions_df" in st.session_state["datasets_used_this_run"]
@@ -0,0 +1,58 @@
+"""
+Tests for src.utils.merge_engine.
+"""
+import pandas as pd
+from src.utils.merge_engine import ADMISSION_KEY, plan_upsert, resolve_incoming_ids, upsert_records
+
+def admissions(rows):
+    """Build an admissions frame from (client ID, admission date, admission ID) tuples."""
+    return pd.DataFrame(rows, columns=["ProviderClientId", "AdmissionDate", "ProviderAdmissionId"])
+
+def test_new_admissions_do_not_reuse_existing_ids():
+    existing = admissions([("1", "01/02/2024", "N1AL240102")])
+    # A different client whose generated ID happens to be the same
+    incoming = admissions([("2", "01/02/2024", "N1AL240102"), ("3", "01/03/2024", "N3AL240103")])
+    resolved = resolve_incoming_ids(existing, incoming, ADMISSION_KEY, "ProviderAdmissionId")
+    merged, counts = upsert_records(existing, resolved, ADMISSION_KEY)
+    assert counts["inserted"] == 2
+    assert merged["ProviderAdmissionId"].is_unique
+    assert resolved["ProviderAdmissionId"].tolist()[1] == "N3AL240103"
+    assert incoming["ProviderAdmissionId"].tolist()[0] == "N1AL240102"
+
+def test_reingested_admissions_keep_their_ids():
+    existing = admissions([("1", "01/02/2024", "N1AL240102"), ("2", "01/02/2024", "N1AL2401021")])
+    incoming = admissions([("1", "01/02/2024", "N1AL240102"), ("2", "01/02/2024", "N1AL240102")])
+    resolved = resolve_incoming_ids(existing, incoming, ADMISSION_KEY, "ProviderAdmissionId")
+    _, counts = upsert_records(existing, resolved, ADMISSION_KEY)
+    assert resolved["ProviderAdmissionId"].tolist() == ["N1AL240102", "N1AL2401021"]
+    assert counts == {"inserted": 0, "updated": 0, "skipped": 2}
+
+def test_unchanged_input_is_returned_as_is():
+    existing = admissions([("1", "01/02/2024", "A1")])
+    incoming = admissions([("2", "01/02/2024", "B2")])
+    assert resolve_incoming_ids(existing, incoming, ADMISSION_KEY, "ProviderAdmissionId") is incoming
+
+def test_plan_lists_only_changed_cells_and_new_rows():
+    existing = admissions([("1", "01/02/2024", "A1"), ("2", "01/02/2024", "B2")])
+    incoming = admissions([("2", "01/02/2024", "B9"), ("3", "01/03/2024", "C3")])
+    plan = plan_upsert(existing, incoming, ADMISSION_KEY)
+    assert plan["replace"] is None
+    assert plan["updates"] == {1: {"ProviderAdmissionId": "B9"}}
+    assert plan["inserts"]["ProviderClientId"].tolist() == ["3"]
+    assert plan["counts"] == {"inserted": 1, "updated": 1, "skipped": 0}
+
+def test_key_index_matches_like_hashing():
+    existing = admissions([("1", "01/02/2024", "A1"), ("1", "01/03/2024", "A2"), ("2", "01/02/2024", "B2")])
+    incoming = admissions([("1", "01/03/2024", "A2"), ("1", "01/04/2024", "A2"), ("2", "01/02/2024", "B3")])
+    key_index = {"1": [0, 1], "2": [2]}
+    resolved = resolve_incoming_ids(existing, incoming, ADMISSION_KEY, "ProviderAdmissionId")
+    indexed = resolve_incoming_ids(
+        existing, incoming, ADMISSION_KEY, "ProviderAdmissionId",
+        key_index=key_index, existing_ids={"A1", "A2", "B2"}
+    )
+    pd.testing.assert_frame_equal(indexed, resolved)
+    plan = plan_upsert(existing, resolved, ADMISSION_KEY)
+    indexed_plan = plan_upsert(existing, resolved, ADMISSION_KEY, key_index=key_index)
+    assert indexed_plan["updates"] == plan["updates"]
+    assert indexed_plan["counts"] == plan["counts"]
+    pd.testing.assert_frame_equal(indexed_plan["inserts"], plan["inserts"])
@@ -0,0 +1,83 @@
+"""
+Parity tests for the vectorized normalize_dataframe against the original row-wise version.
+"""
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.normalize_baseline import baseline_normalize_dataframe
+from src.utils.data_processing import normalize_dataframe
+
+def assert_same_output(raw):
+    """Run both implementations on copies of raw and compare the results."""
+    expected = baseline_normalize_dataframe(raw.copy())
+    actual = normalize_dataframe(raw.copy())
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual.astype(object), expected.astype(object), check_dtype=False)
+
+def generated_roster(rows, seed=7):
+    """Build a roster mixing well-formed and awkward values in every mapped column."""
+    rng = random.Random(seed)
+    names = ["John Smith", "Mary Ann  Lee", "Cher", "  Jean Luc Picard ", "", "O'Brien Miles", "Ana\tMaria Gomez"]
+    dates = ["1/2/1990", "01/02/1990", "12/31/1985", "2/30/2000", "13/01/1990", "1990-01-02",
+             "", "  3/4/2024  ", "1/1/1500", "1/1/9999", "garbage"]
+    ids = [str(i) for i in range(rows)]
+    for i in range(0, rows, 7):
+        ids[i] = f"{i}.0"
+    return pd.DataFrame({
+        " Unique ID ": ids,
+        "Client": [rng.choice(names) for _ in range(rows)],
+        "DOB": [rng.choice(dates) for _ in range(rows)],
+        "Admission Date": [rng.choice(dates) for _ in range(rows)],
+        "Zip": [rng.choice(["80202", "", None, "80202-1234"]) for _ in range(rows)],
+        "Referral Source": [rng.choice(["Court", None, "Self", "nan"]) for _ in range(rows)],
+    })
+
+def test_generated_roster_matches_baseline():
+    assert_same_output(generated_roster(2000))
+
+def test_split_names():
+    raw = pd.DataFrame({
+        "id": ["1", "2", "3", "4", "5"],
+        "Client": ["John Smith", "Mary Ann Lee", "Cher", "   ", "Ana  Maria\tGomez"],
+        "First Name": ["", "", "", "", "Ana"],
+        "Last Name": ["", "", "", "", ""],
+    })
+    assert_same_output(raw)
+    result = normalize_dataframe(raw.copy())
+    assert result["FirstName"].tolist() == ["John", "Mary Ann", "", "", "Ana Maria"]
+    assert result["LastName"].tolist() == ["Smith", "Lee", "Cher", "", "Gomez"]
+
+def test_existing_first_and_last_names_are_kept():
+    raw = pd.DataFrame({
+        "id": ["1", "2"],
+        "Client": ["John Smith", "Jane Doe"],
+        "First Name": ["Johnny", ""],
+        "Last Name": ["Smithers", "Roe"],
+    })
+    assert_same_output(raw)
+
+def test_float_ids_lose_their_decimal_point():
+    raw = pd.DataFrame({"id": ["123.0", " 45 ", "", "7.0"], "Client": ["A B"] * 4})
+    assert_same_output(raw)
+    assert normalize_dataframe(raw.copy())["ProviderClientId"].tolist() == ["123", "45", "", "7"]
+
+def test_numeric_id_column():
+    raw = pd.DataFrame({"id": [123.0, 4.0, np.nan], "Client": ["A B"] * 3})
+    assert_same_output(raw)
+    assert normalize_dataframe(raw.copy())["ProviderClientId"].tolist() == ["123", "4", ""]
+
+def test_invalid_and_out_of_range_dates():
+    raw = pd.DataFrame({
+        "id": [str(i) for i in range(9)],
+        "DOB": ["2/30/2000", "13/1/1990", "1990-01-02", "abc", "", "1/1/1500", "12/31/9999", "1/2/1990", " 1/2/1990 "],
+        "Admission Date": ["1/1/1500", "", "0/1/2000", "1/32/2000", "2/29/2024", "2/29/2023", "x", "1/2/3", "01/02/1990"],
+    })
+    assert_same_output(raw)
+
+def test_non_numeric_ids_are_kept():
+    raw = pd.DataFrame({"id": ["A-100", "200", "12.5x"], "Client": ["A B"] * 3})
+    # The original implementation aborted the whole ingest on these
+    with pytest.raises(ValueError):
+        baseline_normalize_dataframe(raw.copy())
+    assert normalize_dataframe(raw.copy())["ProviderClientId"].tolist() == ["A-100", "200", "12.5x"]
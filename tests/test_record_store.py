@@ -0,0 +1,70 @@
+"""
+Tests for src.utils.record_store.
+"""
+import pandas as pd
+from src.utils.record_store import RecordStore
+
+def make_store(tmp_path, rows):
+    """Open a store holding a clients dataset with the given number of rows."""
+    store = RecordStore(str(tmp_path / "records.db"))
+    store.replace("clients_df", pd.DataFrame({
+        "ProviderClientId": [str(i) for i in range(rows)],
+        "FirstName": ["Ann"] * rows,
+        "Gender": [""] * rows,
+    }))
+    return store
+
+def test_update_changes_cells_by_position(tmp_path):
+    store = make_store(tmp_path, 5)
+    version = store.version("clients_df")
+    store.update("clients_df", {0: {"FirstName": "Bea"}, 3: {"Gender": "Male", "FirstName": "Cy"}, 9: {"Gender": "x"}})
+    df = store.load("clients_df")
+    assert df["FirstName"].tolist() == ["Bea", "Ann", "Ann", "Cy", "Ann"]
+    assert df["Gender"].tolist() == ["", "", "", "Male", ""]
+    assert store.version("clients_df") == version + 1
+    store.close()
+
+def test_update_follows_row_order_after_appends(tmp_path):
+    store = make_store(tmp_path, 3)
+    store.append("clients_df", [{"ProviderClientId": "3", "FirstName": "Dee"}])
+    store.update("clients_df", {3: {"Gender": "Female"}})
+    assert store.find("clients_df", "ProviderClientId", "3")["Gender"].tolist() == ["Female"]
+    store.close()
+
+def test_many_updates_on_a_large_dataset(tmp_path):
+    store = make_store(tmp_path, 100000)
+    updates = {position: {"Gender": "Male"} for position in range(0, 100000, 50)}
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    store.update("clients_df", updates)
+    store._conn.set_trace_callback(None)
+    # Positions are resolved with one read instead of an OFFSET query per update
+    assert sum(statement.startswith("SELECT") for statement in statements) == 1
+    assert not any("OFFSET" in statement for statement in statements)
+    assert store.column_values("clients_df", "Gender").count("Male") == 2000
+    store.close()
+
+def test_replace_writes_only_the_differences(tmp_path):
+    store = make_store(tmp_path, 5)
+    row_ids = [row[0] for row in store._conn.execute("SELECT _rowid FROM clients_df ORDER BY _rowid")]
+    version = store.version("clients_df")
+    store.replace("clients_df", store.load("clients_df"))
+    assert store.version("clients_df") == version
+
+    df = store.load("clients_df").iloc[:4].drop(columns="Gender")
+    df.loc[1, "FirstName"] = "Bea"
+    df["ZipCode"] = "80202"
+    store.replace("clients_df", df)
+    assert [row[0] for row in store._conn.execute("SELECT _rowid FROM clients_df ORDER BY _rowid")] == row_ids[:4]
+    pd.testing.assert_frame_equal(store.load("clients_df"), df)
+    assert store.version("clients_df") == version + 1
+    store.close()
+
+def test_paged_and_narrow_reads(tmp_path):
+    store = make_store(tmp_path, 10)
+    page = store.read_page("clients_df", 4, 3, ["ProviderClientId", "Missing"])
+    assert page["ProviderClientId"].tolist() == ["4", "5", "6"]
+    assert page["Missing"].isna().all()
+    assert list(store.load("clients_df", ["FirstName"]).columns) == ["FirstName"]
+    assert len(store.read_page("clients_df", 8, 5)) == 2
+    store.close()